@@ -12,8 +12,15 @@ import sys
 import os
 import time
 import random
-from datetime import datetime, timedelta
+import functools
+import concurrent.futures
+import hashlib
+import heapq
+import io
+import re
+from datetime import date, datetime, timedelta
 from typing import Dict, List, Optional, Any
+from collections import Counter, namedtuple
 import threading
 
 # Visual enhancements
@@ -25,6 +32,20 @@ except ImportError:
     VISUAL_AVAILABLE = False
     print("Note: Install 'pip install colorama' for enhanced visual interface")
 
+# Colour codes resolved once; empty strings when colorama isn't available
+if VISUAL_AVAILABLE:
+    CYAN, GREEN, YELLOW, RED, MAGENTA, RESET = (
+        Fore.CYAN, Fore.GREEN, Fore.YELLOW, Fore.RED, Fore.MAGENTA, Style.RESET_ALL
+    )
+else:
+    CYAN = GREEN = YELLOW = RED = MAGENTA = RESET = ''
+
+# Faster schedule (de)serialization when orjson is installed
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Add config path for credentials
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'config'))
 try:
@@ -33,13 +54,313 @@ except ImportError:
     CLAUDE_API_KEY = None
     print("Warning: credentials.py not found. Some AI features will be limited.")
 
+def _piped_input(prompt=""):
+    """input() replacement for piped stdin - skips the readline hook machinery"""
+    sys.stdout.write(prompt)
+    sys.stdout.flush()
+    line = sys.stdin.readline()
+    if not line:
+        raise EOFError
+    return line.rstrip('\n')
+
+# Interactive terminals keep input(); scripted/piped sessions read stdin directly
+read_input = input if sys.stdin is None or sys.stdin.isatty() else _piped_input
+
+@functools.lru_cache(maxsize=1024)
+def _parse_ymd(date_str):
+    """Parse a YYYY-MM-DD due date, cached since many tasks share a date.
+    Returns None for values that don't parse."""
+    try:
+        return date.fromisoformat(date_str)
+    except (ValueError, TypeError):
+        return None
+
+_WORK_HOURS_RE = re.compile(r"(\d{1,2})\s*-\s*(\d{1,2})")
+
+@functools.lru_cache(maxsize=None)
+def _parse_work_hours(work_hours):
+    """Parse a "9-17" style work window into (start, end) hours, cached per string.
+    Falls back to (9, 17) when the text doesn't match."""
+    match = _WORK_HOURS_RE.match(work_hours.strip())
+    return (int(match[1]), int(match[2])) if match else (9, 17)
+
+_today_cache = [None, None]  # [date, "YYYY-MM-DD"]
+
+def today_str():
+    """Today's date as YYYY-MM-DD, reformatted only when the day rolls over"""
+    today = date.today()
+    if _today_cache[0] != today:
+        _today_cache[:] = [today, today.isoformat()]
+    return _today_cache[1]
+
+@functools.lru_cache(maxsize=512)
+def _parse_hhmm(hhmm):
+    """Parse "HH:MM" into (hour, minute), cached since schedules reuse the same slots"""
+    hour, minute = hhmm.split(':')
+    return int(hour), int(minute)
+
+# Priority label for every possible urgency + importance total (0-20)
+PRIORITY_LEVELS = tuple(
+    "🟢 LOW" if total < 12 else "🟡 MEDIUM" if total < 16 else "🔥 HIGH"
+    for total in range(21)
+)
+
+# Icon-only form of PRIORITY_LEVELS for compact list rendering
+PRIORITY_ICONS = tuple(level.split()[0] for level in PRIORITY_LEVELS)
+
+def priority_icon_for(priority_total):
+    """Priority icon for an urgency + importance total, clamped to 0-20"""
+    return PRIORITY_ICONS[min(max(priority_total, 0), 20)]
+
+# CSS class per priority total for HTML exports, same buckets as PRIORITY_LEVELS
+PRIORITY_CLASSES = tuple(
+    "low-priority" if total < 12 else "medium-priority" if total < 16 else "high-priority"
+    for total in range(21)
+)
+
+def priority_class_for(priority_total):
+    """HTML priority class for an urgency + importance total, clamped to 0-20"""
+    return PRIORITY_CLASSES[min(max(priority_total, 0), 20)]
+
+# Energy level icons; anything other than high/medium shows as low
+ENERGY_ICONS = {'high': '⚡', 'medium': '🔋'}
+LOW_ENERGY_ICON = '💤'
+
+# Working days covered by a weekly schedule, in calendar order
+WEEKDAYS = ('Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday')
+
+def weekly_days(schedule_data):
+    """(day, day_schedule) pairs of a saved weekly schedule, skipping metadata keys"""
+    weekly_schedule = schedule_data.get('schedule', {})
+    return [(day, weekly_schedule[day]) for day in WEEKDAYS if day in weekly_schedule]
+
+# Deadline status by days until due, clamped to 0 (due today or overdue) .. 8 (later)
+DEADLINE_STATUS_BY_DAYS = (
+    'overdue', 'urgent', 'approaching', 'approaching',
+    'thisweek', 'thisweek', 'thisweek', 'thisweek', 'future'
+)
+
+def deadline_status_for(days_until_due):
+    """Deadline status used for colour coding and alerts; 'none' without a due date"""
+    if days_until_due is None:
+        return 'none'
+    return DEADLINE_STATUS_BY_DAYS[min(max(days_until_due, 0), 8)]
+
+# Deadline status -> icon, colour, and plain-text tag when colorama is missing
+DEADLINE_ICONS = {'overdue': '🚨', 'urgent': '⏰', 'approaching': '📅', 'thisweek': '📆'}
+DEADLINE_COLORS = {'overdue': RED, 'urgent': RED, 'approaching': YELLOW, 'thisweek': CYAN}
+DEADLINE_TAGS = {'overdue': '[OVERDUE]', 'urgent': '[URGENT]', 'approaching': '[DUE SOON]', 'thisweek': '[THIS WEEK]'}
+
+# "HH:MM-HH:MM" time block label, parsed once
+_TB_FMT = "{:02d}:{:02d}-{:02d}:{:02d}".format
+
+def time_block_label(start_hours, end_hours):
+    """Format a block given in fractional hours (9.25 -> 09:15) as HH:MM-HH:MM"""
+    return _TB_FMT(*divmod(round(start_hours * 60), 60), *divmod(round(end_hours * 60), 60))
+
+# Row shape returned by MasterJarvisDatabase.get_tasks / get_tasks_full
+Task = namedtuple('Task', [
+    'id', 'title', 'description', 'urgency_score', 'importance_score',
+    'estimated_time', 'actual_time', 'category', 'status', 'created_at',
+    'completed_at', 'due_date', 'energy_level', 'context', 'tags', 'priority_total'
+])
+
+_TASK_SELECT = '''
+    SELECT id, title, description, 
+           COALESCE(urgency_score, 5) as urgency_score, 
+           COALESCE(importance_score, 5) as importance_score, 
+           estimated_time, actual_time, category, status, created_at,
+           completed_at, due_date, energy_level, context, tags,
+           (COALESCE(urgency_score, 5) + COALESCE(importance_score, 5)) as priority_total
+    FROM tasks 
+    WHERE status = ?
+'''
+
+# Scheduling view: same columns, with the remaining nullable fields defaulted in SQL
+_SCHEDULING_SELECT = '''
+    SELECT id, title, COALESCE(description, '') as description, 
+           COALESCE(urgency_score, 5) as urgency_score, 
+           COALESCE(importance_score, 5) as importance_score, 
+           COALESCE(estimated_time, 1.0) as estimated_time, actual_time,
+           COALESCE(category, 'general') as category, status, created_at,
+           completed_at, due_date, energy_level, context, tags,
+           (COALESCE(urgency_score, 5) + COALESCE(importance_score, 5)) as priority_total
+    FROM tasks 
+    WHERE status = ?
+'''
+
+# Prebuilt statement text per supported ordering
+TASK_QUERIES = {
+    'priority': _TASK_SELECT + 'ORDER BY priority_total DESC, created_at ASC LIMIT ?',
+    'created': _TASK_SELECT + 'ORDER BY created_at ASC LIMIT ?',
+    'scheduling': _SCHEDULING_SELECT + 'ORDER BY priority_total DESC, created_at ASC LIMIT ?',
+}
+
+# Schedule lookups, kept as constants so every caller sends identical SQL text
+# and hits the connection's prepared statement cache
+SCHEDULE_BY_ID_QUERY = '''
+    SELECT name, schedule_date, schedule_data, created_at 
+    FROM schedules 
+    WHERE id = ?
+'''
+WEEKLY_SCHEDULES_QUERY = '''
+    SELECT id, name, schedule_date, schedule_data, created_at
+    FROM schedules 
+    WHERE kind = 'weekly'
+      AND json_valid(schedule_data)
+      AND json_type(schedule_data, '$.schedule') = 'object'
+    ORDER BY created_at DESC
+    LIMIT ?
+'''
+
 class DateTimeEncoder(json.JSONEncoder):
-    """Custom JSON encoder to handle datetime objects"""
+    """Custom JSON encoder to handle datetime and date objects.
+    default() only runs for values json can't encode itself, so payloads without
+    them still go through the C encoder."""
     def default(self, obj):
-        if isinstance(obj, datetime):
+        if isinstance(obj, date):  # datetime is a date subclass
             return obj.isoformat()
         return super(DateTimeEncoder, self).default(obj)
 
+# Exports are assembled in memory and written with one call through a 1 MiB buffer
+EXPORT_BUFFER_SIZE = 1 << 20
+
+# Calendar and HTML export fragments, formatted once per event
+ICS_HEADER = "BEGIN:VCALENDAR\nVERSION:2.0\nPRODID:Jarvis AI Assistant\n"
+ICS_FOOTER = "END:VCALENDAR\n"
+ICS_EVENT_TMPL = (
+    "BEGIN:VEVENT\n"
+    "DTSTART:{s}\n"
+    "DTEND:{e}\n"
+    "SUMMARY:{t}\n"
+    "DESCRIPTION:Category: {c} | Priority: {p}/20{notes}\n"
+    "END:VEVENT\n"
+)
+HTML_HEADER_TMPL = """
+<!DOCTYPE html>
+<html>
+<head>
+    <title>{name} - {date}</title>
+    <style>
+        body {{ font-family: Arial, sans-serif; margin: 20px; }}
+        .header {{ color: #2c3e50; border-bottom: 2px solid #3498db; padding-bottom: 10px; }}
+        .schedule-item {{ margin: 10px 0; padding: 10px; background: #f8f9fa; border-left: 4px solid #3498db; }}
+        .time {{ font-weight: bold; color: #2c3e50; }}
+        .task {{ font-size: 1.1em; color: #34495e; }}
+        .details {{ color: #7f8c8d; font-size: 0.9em; }}
+        .high-priority {{ border-left-color: #e74c3c; }}
+        .medium-priority {{ border-left-color: #f39c12; }}
+        .low-priority {{ border-left-color: #27ae60; }}
+    </style>
+</head>
+<body>
+    <div class="header">
+        <h1>📅 {name}</h1>
+        <p>Date: {date} | Work Hours: {work_hours}</p>
+    </div>
+"""
+HTML_AI_TMPL = """
+    <div class="header" style="margin-top: 30px;">
+        <h2>🤖 AI Recommendations</h2>
+    </div>
+    <div style="background: #e8f6f3; padding: 15px; border-radius: 5px;">
+        <p>{recommendations}</p>
+    </div>
+"""
+HTML_FOOTER = """
+</body>
+</html>
+"""
+HTML_ITEM_TMPL = """
+    <div class="schedule-item {priority_class}">
+        <div class="time">{time}</div>
+        <div class="task">{icon} {task}</div>
+        <div class="details">📂 {category} | 🎯 Priority: {priority}/20</div>
+    </div>
+"""
+
+# Weekly HTML export fragments
+WEEKLY_HTML_HEADER_TMPL = """
+<!DOCTYPE html>
+<html>
+<head>
+    <title>{name} - Weekly Schedule</title>
+    <style>
+        body {{ font-family: Arial, sans-serif; margin: 20px; }}
+        .header {{ color: #2c3e50; border-bottom: 3px solid #3498db; padding-bottom: 15px; margin-bottom: 20px; }}
+        .week-overview {{ display: grid; grid-template-columns: repeat(5, 1fr); gap: 15px; margin: 20px 0; }}
+        .day-card {{ border: 2px solid #ecf0f1; border-radius: 8px; padding: 15px; background: #f8f9fa; }}
+        .day-header {{ font-weight: bold; color: #2c3e50; border-bottom: 1px solid #bdc3c7; padding-bottom: 8px; margin-bottom: 10px; }}
+        .task-item {{ margin: 8px 0; padding: 8px; border-radius: 4px; }}
+        .high-priority {{ background: #ffeaa7; border-left: 4px solid #e17055; }}
+        .medium-priority {{ background: #fab1a0; border-left: 4px solid #fd79a8; }}
+        .low-priority {{ background: #a4f7c0; border-left: 4px solid #00b894; }}
+        .task-details {{ font-size: 0.85em; color: #636e72; margin-top: 4px; }}
+        .weekly-summary {{ background: #e8f6f3; padding: 20px; border-radius: 8px; margin: 20px 0; }}
+        .goals {{ background: #ffeaa7; padding: 15px; border-radius: 8px; margin: 15px 0; }}
+    </style>
+</head>
+<body>
+    <div class="header">
+        <h1>🗓️ {name}</h1>
+        <p>📅 Week of {start_date} | ⏰ Work Hours: {work_hours} | ⏱️ Total: {total_hours} hours</p>
+    </div>
+"""
+WEEKLY_HTML_GOALS_TMPL = """
+    <div class="goals">
+        <h3>🎯 Weekly Goals</h3>
+        <p>{goals}</p>
+    </div>
+"""
+WEEKLY_HTML_DAY_TMPL = """
+        <div class="day-card">
+            <div class="day-header">📅 {day}<br><small>{date}</small></div>
+            <div><strong>{focus}</strong></div>
+            <div>⏱️ {hours:.1f} hours</div>
+"""
+WEEKLY_HTML_TASK_TMPL = """
+            <div class="task-item {priority_class}">
+                <div>{icon} {title}</div>
+                <div class="task-details">⏱️ {est_time}h | 📂 {category} | {energy_icon}</div>
+            </div>
+"""
+WEEKLY_HTML_SUMMARY_TMPL = """
+    <div class="weekly-summary">
+        <h3>📊 Weekly Summary</h3>
+        <p>⏱️ Total planned hours: {total_hours}</p>
+        <p>📈 Daily average: {daily_average} hours</p>
+        <p>🎯 Priority focus: {priority_focus}</p>
+    </div>
+"""
+WEEKLY_HTML_AI_TMPL = """
+    <div class="weekly-summary">
+        <h3>🤖 AI Weekly Analysis</h3>
+        <p>{analysis}</p>
+    </div>
+"""
+
+# Parsed schedules kept by MasterJarvis._load_schedule_data (LRU by insertion order)
+SCHEDULE_CACHE_SIZE = 128
+
+# Shared encoder instance for saving schedules, built once. Compact separators and
+# raw UTF-8 (emoji stay as-is rather than \u escapes) keep the stored rows small
+SCHEDULE_ENCODER = DateTimeEncoder(separators=(',', ':'), ensure_ascii=False)
+
+# Schedule JSON codec: orjson (handles datetime natively, same compact UTF-8 output)
+# when available, otherwise the stdlib with the shared encoder above.
+# orjson.JSONDecodeError subclasses json.JSONDecodeError, so existing
+# `except json.JSONDecodeError` handlers cover both backends.
+if orjson is not None:
+    _json_loads = orjson.loads
+    
+    def _json_dumps(obj):
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
+else:
+    # Schedule rows are always str, so call a decoder directly and skip the
+    # type/encoding checks json.loads does before reaching its default decoder
+    _json_loads = json.JSONDecoder().decode
+    _json_dumps = SCHEDULE_ENCODER.encode
+
 class VisualEffects:
     """Visual effects and animations for enhanced interface"""
     
@@ -129,12 +450,23 @@ class MasterJarvisDatabase:
     def __init__(self, db_path='data/master_jarvis.db'):
         self.db_path = db_path
         os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        # One connection for the lifetime of the assistant instead of one per call
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        # Bumped by every task write so cached analyses know when they are stale
+        self._write_version = 0
+        self._cached_patterns = None
+        self._cached_patterns_version = None
         self.init_database()
     
+    def close(self):
+        """Close the shared database connection"""
+        self.conn.close()
+    
     def init_database(self):
         """Initialize all database tables"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        cursor = self.conn.cursor()
         
         # Enhanced tasks table with time support
         cursor.execute('''
@@ -195,10 +527,23 @@ class MasterJarvisDatabase:
                 name TEXT NOT NULL,
                 schedule_date TEXT NOT NULL,
                 schedule_data TEXT NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                kind TEXT
             )
         ''')
         
+        # Add kind column to schedules saved before it existed
+        try:
+            cursor.execute('ALTER TABLE schedules ADD COLUMN kind TEXT')
+            cursor.execute('''
+                UPDATE schedules SET kind = 'weekly'
+                WHERE name LIKE 'Week_%' OR schedule_data LIKE '%weekly_goals%'
+            ''')
+        except sqlite3.OperationalError:
+            pass  # Column already exists
+        
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_schedules_kind ON schedules (kind, created_at)')
+        
         # User preferences and settings
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS user_preferences (
@@ -208,15 +553,19 @@ class MasterJarvisDatabase:
             )
         ''')
         
-        conn.commit()
-        conn.close()
+        # Serves the pending-by-priority listing (expression matches TASK_QUERIES)
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_tasks_pending_prio
+            ON tasks (status, (COALESCE(urgency_score, 5) + COALESCE(importance_score, 5)))
+        ''')
+        
+        self.conn.commit()
     
     def add_task(self, title, description="", urgency=5, importance=5, 
                  estimated_time=None, category="general", due_date=None, 
                  energy_level="medium", context="", tags=""):
         """Add a new task with comprehensive data"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        cursor = self.conn.cursor()
         
         cursor.execute('''
             INSERT INTO tasks 
@@ -227,55 +576,55 @@ class MasterJarvisDatabase:
               category, due_date, energy_level, context, tags))
         
         task_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
+        self.conn.commit()
+        self._write_version += 1
         
         return task_id
     
     def get_tasks(self, status='pending', limit=None):
         """Get tasks with intelligent sorting"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        query = '''
-            SELECT id, title, description, 
-                   COALESCE(urgency_score, 5) as urgency_score, 
-                   COALESCE(importance_score, 5) as importance_score, 
-                   estimated_time, actual_time, category, status, created_at,
-                   completed_at, due_date, energy_level, context, tags,
-                   (COALESCE(urgency_score, 5) + COALESCE(importance_score, 5)) as priority_total
-            FROM tasks 
-            WHERE status = ?
-            ORDER BY priority_total DESC, created_at ASC
-        '''
-        
-        if limit:
-            query += f' LIMIT {limit}'
+        return self.get_tasks_full(status, order='priority', limit=limit)
+    
+    def get_tasks_full(self, status='pending', order='priority', limit=None):
+        """Get tasks as Task namedtuples, ordered by 'priority', 'created' or 'scheduling'"""
+        cursor = self.conn.cursor()
         
-        cursor.execute(query, (status,))
-        tasks = cursor.fetchall()
-        conn.close()
+        # LIMIT -1 means no limit in SQLite, so one statement text serves both cases
+        cursor.execute(TASK_QUERIES[order], (status, limit or -1))
         
-        return tasks
+        return [Task._make(row) for row in cursor.fetchall()]
+    
+    def get_top_priority_pending(self, limit=8):
+        """Top pending tasks by priority with scheduling defaults filled in"""
+        return self.get_tasks_full('pending', order='scheduling', limit=limit)
     
     def complete_task(self, task_id, actual_time=None):
         """Mark task as complete and record actual time"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            UPDATE tasks 
-            SET status = 'completed', completed_at = CURRENT_TIMESTAMP, actual_time = ?
-            WHERE id = ?
-        ''', (actual_time, task_id))
-        
-        conn.commit()
-        conn.close()
+        self.complete_tasks_bulk([(actual_time, task_id)])
+    
+    def complete_tasks_bulk(self, rows):
+        """Complete several tasks in one transaction; rows are (actual_time, task_id)"""
+        with self.conn:
+            self.conn.executemany('''
+                UPDATE tasks 
+                SET status = 'completed', completed_at = CURRENT_TIMESTAMP, actual_time = ?
+                WHERE id = ?
+            ''', rows)
+        self._write_version += 1
+    
+    def delete_tasks(self, task_ids):
+        """Delete several tasks in a single transaction, returns rows deleted"""
+        with self.conn:
+            cursor = self.conn.executemany(
+                "DELETE FROM tasks WHERE id = ?",
+                [(task_id,) for task_id in task_ids]
+            )
+        self._write_version += 1
+        return cursor.rowcount
     
     def save_conversation(self, user_input, ai_response, context="", session_id="", conversation_type="general"):
         """Save conversation for AI learning"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        cursor = self.conn.cursor()
         
         cursor.execute('''
             INSERT INTO conversations 
@@ -283,13 +632,11 @@ class MasterJarvisDatabase:
             VALUES (?, ?, ?, ?, ?)
         ''', (user_input, ai_response, context, session_id, conversation_type))
         
-        conn.commit()
-        conn.close()
+        self.conn.commit()
     
     def get_conversation_history(self, limit=10, session_id=None):
         """Get conversation history for context"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        cursor = self.conn.cursor()
         
         if session_id:
             cursor.execute('''
@@ -308,14 +655,18 @@ class MasterJarvisDatabase:
             ''', (limit,))
         
         conversations = cursor.fetchall()
-        conn.close()
         
         return list(reversed(conversations))  # Return in chronological order
     
     def analyze_productivity_patterns(self):
-        """Analyze user productivity patterns"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        """Analyze user productivity patterns, cached until the tasks change"""
+        cursor = self.conn.cursor()
+        
+        # data_version moves when another connection commits, which covers the
+        # cleanup and recurring-task paths that still write on their own connection
+        version = (self._write_version, cursor.execute('PRAGMA data_version').fetchone()[0])
+        if self._cached_patterns_version == version:
+            return self._cached_patterns
         
         # Time estimation accuracy
         cursor.execute('''
@@ -337,19 +688,27 @@ class MasterJarvisDatabase:
         
         completion_data = cursor.fetchall()
         
-        conn.close()
-        
-        return {
+        self._cached_patterns = {
             'time_estimation': time_data,
             'completion_rates': completion_data
         }
+        self._cached_patterns_version = version
+        return self._cached_patterns
 
 class MasterJarvisAI:
     """Unified AI system for all Jarvis intelligence"""
     
+    # Seconds a Claude response is reused for an identical prompt + context
+    API_CACHE_TTL = 60
+    
     def __init__(self, database):
         self.db = database
         self.session_id = f"session_{int(time.time())}"
+        self._api_cache = {}  # digest -> (timestamp, response)
+        
+    def _cache_key(self, prompt, context):
+        """Compact digest of prompt + context for the response cache"""
+        return hashlib.blake2b(f"{prompt}|{context}".encode('utf-8'), digest_size=16).digest()
         
     def call_claude_api(self, prompt, context=""):
         """Call Claude API with conversation context"""
@@ -357,6 +716,13 @@ class MasterJarvisAI:
             print("Debug: No CLAUDE_API_KEY found")
             return self._fallback_response(prompt)
         
+        # Reuse a recent answer to the same request instead of another round trip
+        cache_key = self._cache_key(prompt, context)
+        cached = self._api_cache.get(cache_key)
+        now = time.time()
+        if cached and now - cached[0] < self.API_CACHE_TTL:
+            return cached[1]
+        
         print(f"Debug: API Key present: {CLAUDE_API_KEY[:15]}..." if CLAUDE_API_KEY else "Debug: No API Key")
         
         # Get conversation history for context
@@ -407,6 +773,11 @@ Provide helpful, specific, and actionable advice. Be conversational but professi
                 # Save conversation for learning
                 self.db.save_conversation(prompt, ai_response, context, self.session_id)
                 
+                # Drop expired entries so the cache stays small, then remember this one
+                self._api_cache = {key: entry for key, entry in self._api_cache.items()
+                                   if now - entry[0] < self.API_CACHE_TTL}
+                self._api_cache[cache_key] = (now, ai_response)
+                
                 return ai_response
             else:
                 print(f"Debug: API error - Status: {response.status_code}, Response: {response.text}")
@@ -465,6 +836,30 @@ class MasterJarvis:
         self.db = MasterJarvisDatabase()
         self.ai = MasterJarvisAI(self.db)
         self.visual = VisualEffects()
+        self._schedule_cache = {}  # schedule id -> (created_at, parsed schedule_data)
+        # Exports go next to the database (created by MasterJarvisDatabase)
+        self._data_dir = os.path.abspath(os.path.dirname(self.db.db_path))
+        
+        # Main menu choice -> handler ('0' exits and is handled in run)
+        self._menu = {
+            '1': self.smart_task_manager,
+            '2': self.show_smart_dashboard,
+            '3': self.complete_task,
+            '4': self.delete_tasks,
+            '5': self.cleanup_recurring_tasks,
+            '6': self.enhanced_ai_conversation,
+            '7': self.ai_productivity_analysis,
+            '8': self.daily_ai_briefing,
+            '9': self.create_daily_schedule,
+            '10': self.manage_saved_schedules,
+            '11': self.export_calendar,
+            '12': self.schedule_task_specific_day,
+            '13': self.smart_weekly_planner,
+            '14': self.weekly_dashboard,
+            '15': self.export_weekly_calendar,
+            '16': self.show_system_analytics,
+            '17': self.manage_preferences,
+        }
         
     def show_startup_animation(self):
         """Beautiful startup sequence"""
@@ -482,46 +877,46 @@ class MasterJarvis:
         """Display streamlined main menu"""
         self.visual.print_header("MASTER JARVIS - UNIFIED CONTROL CENTER")
         
-        print(f"{Fore.CYAN if VISUAL_AVAILABLE else ''}📋 TASK MANAGEMENT{Style.RESET_ALL if VISUAL_AVAILABLE else ''}")
+        print(f"{CYAN}📋 TASK MANAGEMENT{RESET}")
         self.visual.print_menu_option("1", "🎯 Smart Task Manager (Add/Schedule/Recurring)")
         self.visual.print_menu_option("2", "📊 Smart Task Dashboard") 
         self.visual.print_menu_option("3", "✅ Complete Task")
         self.visual.print_menu_option("4", "🗑️  Delete Tasks (Single/Multiple)")
         self.visual.print_menu_option("5", "🧹 Clean Up Recurring Tasks")
         
-        print(f"\n{Fore.CYAN if VISUAL_AVAILABLE else ''}🤖 AI INTELLIGENCE{Style.RESET_ALL if VISUAL_AVAILABLE else ''}")
+        print(f"\n{CYAN}🤖 AI INTELLIGENCE{RESET}")
         self.visual.print_menu_option("6", "💬 Enhanced AI Conversation")
         self.visual.print_menu_option("7", "📈 AI Productivity Analysis")
         self.visual.print_menu_option("8", "☀️  Daily AI Briefing")
         
-        print(f"\n{Fore.CYAN if VISUAL_AVAILABLE else ''}📅 SCHEDULE MANAGEMENT{Style.RESET_ALL if VISUAL_AVAILABLE else ''}")
+        print(f"\n{CYAN}📅 SCHEDULE MANAGEMENT{RESET}")
         self.visual.print_menu_option("9", "📋 Create Daily Schedule")
         self.visual.print_menu_option("10", "💾 Save/Load Schedules")
         self.visual.print_menu_option("11", "📤 Export Calendar")
         self.visual.print_menu_option("12", "📅 Schedule Task for Specific Day")
         
-        print(f"\n{Fore.CYAN if VISUAL_AVAILABLE else ''}🗓️ WEEKLY PLANNING{Style.RESET_ALL if VISUAL_AVAILABLE else ''}")
+        print(f"\n{CYAN}🗓️ WEEKLY PLANNING{RESET}")
         self.visual.print_menu_option("13", "🗓️ Smart Weekly Planner")
         self.visual.print_menu_option("14", "📊 Weekly Dashboard") 
         self.visual.print_menu_option("15", "📤 Export Weekly Calendar")
         
-        print(f"\n{Fore.CYAN if VISUAL_AVAILABLE else ''}🔧 SYSTEM{Style.RESET_ALL if VISUAL_AVAILABLE else ''}")
+        print(f"\n{CYAN}🔧 SYSTEM{RESET}")
         self.visual.print_menu_option("16", "📊 System Analytics")
         self.visual.print_menu_option("17", "⚙️  Preferences")
         self.visual.print_menu_option("0", "🚪 Exit")
         
-        print(f"\n{Fore.YELLOW if VISUAL_AVAILABLE else ''}✨ Streamlined AI learning - focused on your top 3 categories!{Style.RESET_ALL if VISUAL_AVAILABLE else ''}")
+        print(f"\n{YELLOW}✨ Streamlined AI learning - focused on your top 3 categories!{RESET}")
     
     def add_intelligent_task(self):
         """Add task with AI analysis"""
         self.visual.print_header("➕ ADD INTELLIGENT TASK")
         
-        title = input("📝 Task title: ").strip()
+        title = read_input("📝 Task title: ").strip()
         if not title:
             print("❌ Task title cannot be empty!")
             return
         
-        description = input("📋 Task description (optional): ").strip()
+        description = read_input("📋 Task description (optional): ").strip()
         
         # AI analysis
         self.visual.print_ai_response("Analyzing your task...", thinking=True)
@@ -530,24 +925,24 @@ class MasterJarvis:
         self.visual.print_ai_response(ai_analysis)
         
         # Get priority scores
-        print(f"\n{Fore.CYAN if VISUAL_AVAILABLE else ''}🎯 Priority Assessment (1-10 scale):{Style.RESET_ALL if VISUAL_AVAILABLE else ''}")
+        print(f"\n{CYAN}🎯 Priority Assessment (1-10 scale):{RESET}")
         print("=" * 50)
         
         try:
             print("⚡ Urgency (how soon needed):")
             print("   Scale: 1=Low urgency, 10=Extremely urgent")
-            urgency_input = input("   Enter urgency (1-10): ").strip()
+            urgency_input = read_input("   Enter urgency (1-10): ").strip()
             urgency = int(urgency_input) if urgency_input else 5
             urgency = max(1, min(10, urgency))  # Ensure 1-10 range
             
             print(f"\n🎯 Importance (impact if not completed):")
             print("   Scale: 1=Low impact, 10=Critical impact")
-            importance_input = input("   Enter importance (1-10): ").strip()
+            importance_input = read_input("   Enter importance (1-10): ").strip()
             importance = int(importance_input) if importance_input else 5
             importance = max(1, min(10, importance))  # Ensure 1-10 range
             
             print(f"\n⏱️  Time Estimation:")
-            estimated_time_input = input("   Estimated hours (or press Enter to skip): ").strip()
+            estimated_time_input = read_input("   Estimated hours (or press Enter to skip): ").strip()
             estimated_time = float(estimated_time_input) if estimated_time_input else None
             
         except ValueError:
@@ -557,14 +952,14 @@ class MasterJarvis:
         print(f"\n✅ Priority scores set: Urgency={urgency}/10, Importance={importance}/10")
         
         print(f"\n📂 Task Category:")
-        category = input("   Enter category (work/personal/learning/admin): ").strip() or "general"
+        category = read_input("   Enter category (work/personal/learning/admin): ").strip() or "general"
         
         # Add deadline input
-        due_date_input = input("📅 Deadline (YYYY-MM-DD) or 'none': ").strip()
+        due_date_input = read_input("📅 Deadline (YYYY-MM-DD) or 'none': ").strip()
         due_date = None
         if due_date_input.lower() not in ['none', 'n', '']:
             try:
-                due_date = datetime.strptime(due_date_input, "%Y-%m-%d").strftime("%Y-%m-%d")
+                due_date = date.fromisoformat(due_date_input).isoformat()
                 print(f"✅ Deadline set for: {due_date}")
             except ValueError:
                 print("⚠️ Invalid date format, no deadline set")
@@ -581,13 +976,13 @@ class MasterJarvis:
         )
         
         priority_total = urgency + importance
-        priority_level = "🔥 HIGH" if priority_total >= 16 else "🟡 MEDIUM" if priority_total >= 12 else "🟢 LOW"
+        priority_level = PRIORITY_LEVELS[priority_total]
         
         print(f"\n✅ Task added successfully!")
         print(f"🆔 Task ID: {task_id}")
         print(f"🎯 Priority: {priority_level} ({priority_total}/20)")
         
-        input("\n📱 Press Enter to continue...")
+        read_input("\n📱 Press Enter to continue...")
     
     def smart_task_manager(self):
         """Unified task creation: regular tasks, recurring tasks, and natural language scheduling"""
@@ -601,7 +996,7 @@ class MasterJarvis:
         self.visual.print_menu_option("3", "🔄 Recurring Task - Repeating schedule")
         self.visual.print_menu_option("4", "⚡ Quick Add - Title and category only")
         
-        method = input(f"\n{Fore.GREEN if VISUAL_AVAILABLE else ''}Select method (1-4): {Style.RESET_ALL if VISUAL_AVAILABLE else ''}").strip()
+        method = read_input(f"\n{GREEN}Select method (1-4): {RESET}").strip()
         
         if method == '1':
             self._natural_language_task_creation()
@@ -613,7 +1008,7 @@ class MasterJarvis:
             self._quick_task_creation()
         else:
             print("❌ Invalid choice!")
-            input("\n📱 Press Enter to continue...")
+            read_input("\n📱 Press Enter to continue...")
     
     def _natural_language_task_creation(self):
         """Natural language task creation with AI parsing"""
@@ -626,7 +1021,7 @@ class MasterJarvis:
         print("   • 'Set up daily standup meetings for the next month'")
         
         while True:
-            user_input = input(f"\n{Fore.GREEN if VISUAL_AVAILABLE else ''}What do you need to do? {Style.RESET_ALL if VISUAL_AVAILABLE else ''}").strip()
+            user_input = read_input(f"\n{GREEN}What do you need to do? {RESET}").strip()
             
             if not user_input:
                 print("❌ Please describe your task")
@@ -670,7 +1065,7 @@ class MasterJarvis:
                     if parsed_data.get('estimated_time'):
                         print(f"⏱️ Estimated: {parsed_data.get('estimated_time')} hours")
                     
-                    confirm = input(f"\n✅ Create this task? (y/n): ").strip().lower()
+                    confirm = read_input(f"\n✅ Create this task? (y/n): ").strip().lower()
                     if confirm == 'y':
                         self._create_task_from_parsed_data(parsed_data)
                         
@@ -685,7 +1080,7 @@ class MasterJarvis:
                 self._create_task_manually(user_input)
             
             # Ask if they want to add another
-            another = input("\n📝 Add another task? (y/n): ").strip().lower()
+            another = read_input("\n📝 Add another task? (y/n): ").strip().lower()
             if another != 'y':
                 break
     
@@ -713,19 +1108,19 @@ class MasterJarvis:
     
     def _create_task_manually(self, user_input):
         """Manual task creation fallback"""
-        title = input(f"📝 Task title: ").strip() or user_input[:50]
+        title = read_input(f"📝 Task title: ").strip() or user_input[:50]
         
         print(f"\n📂 Category:")
         self.visual.print_menu_option("1", "📋 Admin")
         self.visual.print_menu_option("2", "👥 Meetings") 
         self.visual.print_menu_option("3", "🏠 Personal")
         
-        cat_choice = input("Select category (1-3): ").strip()
+        cat_choice = read_input("Select category (1-3): ").strip()
         categories = {'1': 'admin', '2': 'meetings', '3': 'personal'}
         category = categories.get(cat_choice, 'admin')
         
-        urgency = int(input("⚡ Urgency (1-10): ") or "5")
-        importance = int(input("🎯 Importance (1-10): ") or "5")
+        urgency = int(read_input("⚡ Urgency (1-10): ") or "5")
+        importance = int(read_input("🎯 Importance (1-10): ") or "5")
         
         task_id = self.db.add_task(
             title=title,
@@ -742,12 +1137,12 @@ class MasterJarvis:
         self.visual.print_header("📋 STRUCTURED TASK CREATION")
         
         while True:
-            title = input("📝 Task title: ").strip()
+            title = read_input("📝 Task title: ").strip()
             if not title:
                 print("❌ Task title cannot be empty!")
                 continue
             
-            description = input("📋 Task description (optional): ").strip()
+            description = read_input("📋 Task description (optional): ").strip()
             
             # AI analysis
             self.visual.print_ai_response("Analyzing your task...", thinking=True)
@@ -760,16 +1155,16 @@ class MasterJarvis:
             self.visual.print_menu_option("2", "👥 Meetings") 
             self.visual.print_menu_option("3", "🏠 Personal")
             
-            cat_choice = input("Select category (1-3): ").strip()
+            cat_choice = read_input("Select category (1-3): ").strip()
             categories = {'1': 'admin', '2': 'meetings', '3': 'personal'}
             category = categories.get(cat_choice, 'admin')
             
             # Priority assessment
             print(f"\n🎯 Priority Assessment (1-10 scale):")
             try:
-                urgency = int(input("⚡ Urgency (1-10): ") or "5")
-                importance = int(input("🎯 Importance (1-10): ") or "5") 
-                estimated_time = float(input("⏱️ Estimated hours: ") or "0") or None
+                urgency = int(read_input("⚡ Urgency (1-10): ") or "5")
+                importance = int(read_input("🎯 Importance (1-10): ") or "5") 
+                estimated_time = float(read_input("⏱️ Estimated hours: ") or "0") or None
             except ValueError:
                 urgency, importance, estimated_time = 5, 5, None
             
@@ -796,7 +1191,7 @@ class MasterJarvis:
                 conn.close()
             
             priority_total = urgency + importance
-            priority_level = "🔥 HIGH" if priority_total >= 16 else "🟡 MEDIUM" if priority_total >= 12 else "🟢 LOW"
+            priority_level = PRIORITY_LEVELS[min(max(priority_total, 0), 20)]
             
             print(f"\n✅ Task created successfully!")
             print(f"🆔 Task ID: {task_id}")
@@ -804,28 +1199,28 @@ class MasterJarvis:
             if due_date:
                 print(f"📅 Due: {due_date}" + (f" at {due_time}" if due_time else ""))
             
-            another = input("\n📝 Add another task? (y/n): ").strip().lower()
+            another = read_input("\n📝 Add another task? (y/n): ").strip().lower()
             if another != 'y':
                 break
     
     def _get_deadline_and_time(self, category):
         """Get deadline and time, with special handling for meetings"""
-        due_date_input = input("📅 Deadline (YYYY-MM-DD) or 'none': ").strip()
+        due_date_input = read_input("📅 Deadline (YYYY-MM-DD) or 'none': ").strip()
         due_date = None
         due_time = None
         
         if due_date_input.lower() not in ['none', 'n', '']:
             try:
-                due_date = datetime.strptime(due_date_input, "%Y-%m-%d").strftime("%Y-%m-%d")
+                due_date = date.fromisoformat(due_date_input).isoformat()
                 
                 # For meetings, always ask for time
                 if category == 'meetings':
-                    due_time = input("🕒 Meeting time (HH:MM, e.g., 14:30): ").strip()
+                    due_time = read_input("🕒 Meeting time (HH:MM, e.g., 14:30): ").strip()
                     if due_time and ':' not in due_time:
                         due_time = None  # Invalid format
                 else:
                     # For other categories, time is optional
-                    due_time = input("🕒 Specific time (optional, HH:MM): ").strip() or None
+                    due_time = read_input("🕒 Specific time (optional, HH:MM): ").strip() or None
                     
             except ValueError:
                 print("⚠️ Invalid date format, no deadline set")
@@ -840,7 +1235,7 @@ class MasterJarvis:
         
         if not pending_tasks:
             print("📋 No pending tasks to delete!")
-            input("\n📱 Press Enter to continue...")
+            read_input("\n📱 Press Enter to continue...")
             return
         
         print("🗑️ Delete Options:")
@@ -848,7 +1243,7 @@ class MasterJarvis:
         self.visual.print_menu_option("2", "🔥 Delete multiple tasks")
         self.visual.print_menu_option("3", "💥 Delete all completed tasks")
         
-        method = input(f"\n{Fore.GREEN if VISUAL_AVAILABLE else ''}Select method (1-3): {Style.RESET_ALL if VISUAL_AVAILABLE else ''}").strip()
+        method = read_input(f"\n{GREEN}Select method (1-3): {RESET}").strip()
         
         if method == '1':
             self._delete_single_task(pending_tasks)
@@ -859,7 +1254,7 @@ class MasterJarvis:
         else:
             print("❌ Invalid choice!")
         
-        input("\n📱 Press Enter to continue...")
+        read_input("\n📱 Press Enter to continue...")
     
     def _delete_single_task(self, tasks):
         """Delete single task"""
@@ -868,18 +1263,14 @@ class MasterJarvis:
             print(f"  {i}. {task[1]} (ID: {task[0]})")
         
         try:
-            choice = int(input("\n🔢 Enter task number to delete: ")) - 1
+            choice = int(read_input("\n🔢 Enter task number to delete: ")) - 1
             if 0 <= choice < len(tasks):
                 task = tasks[choice]
                 task_id, title = task[0], task[1]
                 
-                confirm = input(f"⚠️ Really delete '{title}'? (y/n): ").strip().lower()
+                confirm = read_input(f"⚠️ Really delete '{title}'? (y/n): ").strip().lower()
                 if confirm == 'y':
-                    conn = sqlite3.connect(self.db.db_path)
-                    cursor = conn.cursor()
-                    cursor.execute("DELETE FROM tasks WHERE id = ?", (task_id,))
-                    conn.commit()
-                    conn.close()
+                    self.db.delete_tasks([task_id])
                     print("✅ Task deleted successfully!")
             else:
                 print("❌ Invalid task number!")
@@ -890,14 +1281,13 @@ class MasterJarvis:
         """Delete multiple tasks at once"""
         print("📋 Your pending tasks:")
         for i, task in enumerate(tasks, 1):
-            priority_total = (task[3] or 5) + (task[4] or 5)  # urgency + importance
-            priority_icon = "🔥" if priority_total >= 16 else "🟡" if priority_total >= 12 else "🟢"
+            priority_icon = priority_icon_for(task[15])  # priority_total
             print(f"  {i}. {priority_icon} {task[1]} (ID: {task[0]})")
         
         print(f"\n💡 Enter task numbers to delete:")
         print(f"Examples: '1,3,5' or '1-5' or '1,3,7-10'")
         
-        selection = input("📝 Task numbers to delete: ").strip()
+        selection = read_input("📝 Task numbers to delete: ").strip()
         
         if not selection:
             print("❌ No tasks selected!")
@@ -917,19 +1307,10 @@ class MasterJarvis:
         for task in selected_tasks:
             print(f"  • {task[1]} (ID: {task[0]})")
         
-        confirm = input(f"\n⚠️ Delete all {len(selected_tasks)} selected tasks? (y/n): ").strip().lower()
+        confirm = read_input(f"\n⚠️ Delete all {len(selected_tasks)} selected tasks? (y/n): ").strip().lower()
         
         if confirm == 'y':
-            conn = sqlite3.connect(self.db.db_path)
-            cursor = conn.cursor()
-            
-            task_ids = [task[0] for task in selected_tasks]
-            placeholders = ','.join(['?' for _ in task_ids])
-            cursor.execute(f"DELETE FROM tasks WHERE id IN ({placeholders})", task_ids)
-            
-            deleted_count = cursor.rowcount
-            conn.commit()
-            conn.close()
+            deleted_count = self.db.delete_tasks([task[0] for task in selected_tasks])
             
             print(f"✅ Successfully deleted {deleted_count} tasks!")
         else:
@@ -951,8 +1332,8 @@ class MasterJarvis:
                     # Single number like '3'
                     indices.add(int(part))
             
-            # Filter valid indices
-            return [i for i in indices if 1 <= i <= max_tasks]
+            # Filter valid indices, in list order
+            return sorted(i for i in indices if 1 <= i <= max_tasks)
             
         except ValueError:
             return []
@@ -970,7 +1351,7 @@ class MasterJarvis:
             conn.close()
             return
         
-        confirm = input(f"⚠️ Delete all {completed_count} completed tasks? (y/n): ").strip().lower()
+        confirm = read_input(f"⚠️ Delete all {completed_count} completed tasks? (y/n): ").strip().lower()
         
         if confirm == 'y':
             cursor.execute("DELETE FROM tasks WHERE status = 'completed'")
@@ -989,6 +1370,9 @@ class MasterJarvis:
         conn = sqlite3.connect(self.db.db_path)
         cursor = conn.cursor()
         
+        # Pending count before cleanup; the final count is derived from rows deleted
+        initial_pending = cursor.execute("SELECT COUNT(*) FROM tasks WHERE status = 'pending'").fetchone()[0]
+        
         # Find recurring task patterns
         cursor.execute('''
             SELECT title, COUNT(*) as count
@@ -1004,7 +1388,7 @@ class MasterJarvis:
         
         if not recurring_patterns:
             print("✅ No excessive recurring tasks found!")
-            input("\n📱 Press Enter to continue...")
+            read_input("\n📱 Press Enter to continue...")
             return
         
         print("🔍 Found these excessive recurring tasks:")
@@ -1017,7 +1401,7 @@ class MasterJarvis:
         self.visual.print_menu_option("3", "Keep only next 3 occurrences")
         self.visual.print_menu_option("4", "Manual cleanup by task type")
         
-        choice = input(f"\n{Fore.GREEN if VISUAL_AVAILABLE else ''}Select cleanup option (1-4): {Style.RESET_ALL if VISUAL_AVAILABLE else ''}").strip()
+        choice = read_input(f"\n{GREEN}Select cleanup option (1-4): {RESET}").strip()
         
         if choice == '1':
             # Delete all recurring instances, keep only parent tasks
@@ -1041,6 +1425,7 @@ class MasterJarvis:
             today = datetime.now().date()
             week_from_now = today + timedelta(days=7)
             
+            deleted = 0
             for title, count in recurring_patterns:
                 cursor.execute('''
                     DELETE FROM tasks 
@@ -1048,12 +1433,13 @@ class MasterJarvis:
                     AND title = ?
                     AND (due_date IS NULL OR due_date > ?)
                 ''', (title, week_from_now.strftime("%Y-%m-%d")))
+                deleted += cursor.rowcount
             
-            deleted = cursor.rowcount
             print(f"🗑️ Kept only next 7 days worth, deleted {deleted} future instances")
             
         elif choice == '3':
             # Keep only next 3 occurrences
+            deleted = 0
             for title, count in recurring_patterns:
                 cursor.execute('''
                     DELETE FROM tasks 
@@ -1067,64 +1453,82 @@ class MasterJarvis:
                     AND status = 'pending'
                     AND title = ?
                 ''', (title, title))
+                deleted += cursor.rowcount
             
-            deleted = cursor.rowcount
             print(f"🗑️ Kept only next 3 occurrences per task, deleted {deleted} instances")
             
         elif choice == '4':
-            # Manual cleanup
+            # Manual cleanup - collect keep counts first, then delete in one statement
+            keeps = []
+            deleted = 0
             for i, (title, count) in enumerate(recurring_patterns, 1):
-                keep = input(f"How many instances of '{title}' to keep? (current: {count}): ").strip()
+                keep = read_input(f"How many instances of '{title}' to keep? (current: {count}): ").strip()
                 try:
                     keep_count = int(keep)
-                    if keep_count < count:
-                        cursor.execute('''
-                            DELETE FROM tasks 
-                            WHERE id NOT IN (
-                                SELECT id FROM tasks 
-                                WHERE status = 'pending' 
-                                AND title = ?
-                                ORDER BY due_date ASC, created_at ASC
-                                LIMIT ?
-                            )
-                            AND status = 'pending'
-                            AND title = ?
-                        ''', (title, keep_count, title))
-                        
-                        print(f"🗑️ Kept {keep_count} instances of '{title}'")
                 except ValueError:
                     print(f"⚠️ Skipped '{title}' - invalid number")
-        
+                    continue
+                if keep_count < 0:
+                    print(f"⚠️ Skipped '{title}' - invalid number")
+                elif keep_count < count:
+                    keeps.append((title, keep_count))
+
+            if keeps:
+                cursor.execute('CREATE TEMP TABLE IF NOT EXISTS keep_spec (title TEXT PRIMARY KEY, k INTEGER)')
+                cursor.execute('DELETE FROM keep_spec')
+                cursor.executemany('INSERT OR REPLACE INTO keep_spec (title, k) VALUES (?, ?)', keeps)
+                cursor.execute('''
+                    DELETE FROM tasks
+                    WHERE status = 'pending'
+                    AND title IN (SELECT title FROM keep_spec)
+                    AND id NOT IN (
+                        SELECT id FROM (
+                            SELECT t.id,
+                                   ROW_NUMBER() OVER (
+                                       PARTITION BY t.title
+                                       ORDER BY t.due_date ASC, t.created_at ASC
+                                   ) AS rn,
+                                   k.k
+                            FROM tasks t JOIN keep_spec k ON k.title = t.title
+                            WHERE t.status = 'pending'
+                        )
+                        WHERE rn <= k
+                    )
+                ''')
+                deleted = cursor.rowcount
+                cursor.execute('DROP TABLE keep_spec')
+
+                for title, keep_count in keeps:
+                    print(f"🗑️ Kept {keep_count} instances of '{title}'")
+
         else:
             print("❌ Invalid choice!")
             conn.close()
-            input("\n📱 Press Enter to continue...")
+            read_input("\n📱 Press Enter to continue...")
             return
         
         conn.commit()
+        conn.close()
         
         # Show final count
-        cursor.execute("SELECT COUNT(*) FROM tasks WHERE status = 'pending'")
-        final_count = cursor.fetchone()[0]
-        
-        conn.close()
+        final_count = initial_pending - deleted
         
         print(f"✅ Cleanup complete!")
         print(f"📊 You now have {final_count} pending tasks")
         print(f"💡 Use Option 2 (Smart Task Dashboard) to verify the cleanup")
         
-        input("\n📱 Press Enter to continue...")
+        read_input("\n📱 Press Enter to continue...")
     
     def add_recurring_task(self):
         """Add recurring task with intelligent scheduling"""
         self.visual.print_header("🔄 ADD RECURRING TASK")
         
-        title = input("📝 Task title: ").strip()
+        title = read_input("📝 Task title: ").strip()
         if not title:
             print("❌ Task title cannot be empty!")
             return
         
-        description = input("📋 Task description (optional): ").strip()
+        description = read_input("📋 Task description (optional): ").strip()
         
         # AI analysis for recurring task
         self.visual.print_ai_response("Analyzing your recurring task pattern...", thinking=True)
@@ -1132,14 +1536,14 @@ class MasterJarvis:
         self.visual.print_ai_response(ai_analysis)
         
         # Get recurrence pattern
-        print(f"\n{Fore.CYAN if VISUAL_AVAILABLE else ''}🔄 Recurrence Pattern:{Style.RESET_ALL if VISUAL_AVAILABLE else ''}")
+        print(f"\n{CYAN}🔄 Recurrence Pattern:{RESET}")
         print("=" * 50)
         self.visual.print_menu_option("1", "Daily (every day)")
         self.visual.print_menu_option("2", "Weekly (same day each week)")
         self.visual.print_menu_option("3", "Bi-weekly (every 2 weeks)")
         self.visual.print_menu_option("4", "Monthly (same date each month)")
         
-        pattern_choice = input("\nSelect recurrence pattern (1-4): ").strip()
+        pattern_choice = read_input("\nSelect recurrence pattern (1-4): ").strip()
         
         patterns = {
             '1': 'daily',
@@ -1152,7 +1556,7 @@ class MasterJarvis:
         
         # Get end date or number of occurrences
         print(f"\n🗓️ Recurrence Duration:")
-        duration_type = input("Enter number of occurrences (e.g., '10') or end date (YYYY-MM-DD): ").strip()
+        duration_type = read_input("Enter number of occurrences (e.g., '10') or end date (YYYY-MM-DD): ").strip()
         
         end_date = None
         max_occurrences = 10  # Default
@@ -1163,36 +1567,36 @@ class MasterJarvis:
         except ValueError:
             # Try to parse as date
             try:
-                end_date = datetime.strptime(duration_type, "%Y-%m-%d").strftime("%Y-%m-%d")
+                end_date = date.fromisoformat(duration_type).isoformat()
                 max_occurrences = None
             except ValueError:
                 print("⚠️ Invalid input, defaulting to 10 occurrences")
                 max_occurrences = 10
         
         # Get other task details
-        print(f"\n{Fore.CYAN if VISUAL_AVAILABLE else ''}📊 Task Details:{Style.RESET_ALL if VISUAL_AVAILABLE else ''}")
+        print(f"\n{CYAN}📊 Task Details:{RESET}")
         print("=" * 50)
         
         try:
             print("⚡ Urgency (how soon needed):")
-            urgency_input = input("   Enter urgency (1-10): ").strip()
+            urgency_input = read_input("   Enter urgency (1-10): ").strip()
             urgency = int(urgency_input) if urgency_input else 5
             urgency = max(1, min(10, urgency))
             
             print("🎯 Importance (impact if not completed):")
-            importance_input = input("   Enter importance (1-10): ").strip()
+            importance_input = read_input("   Enter importance (1-10): ").strip()
             importance = int(importance_input) if importance_input else 5
             importance = max(1, min(10, importance))
             
             print("⏱️ Time Estimation:")
-            estimated_time_input = input("   Estimated hours per occurrence: ").strip()
+            estimated_time_input = read_input("   Estimated hours per occurrence: ").strip()
             estimated_time = float(estimated_time_input) if estimated_time_input else 1.0
             
         except ValueError:
             urgency, importance, estimated_time = 5, 5, 1.0
         
         print(f"\n📂 Task Category:")
-        category = input("   Enter category (admin/meetings/learning/personal): ").strip() or "admin"
+        category = read_input("   Enter category (admin/meetings/learning/personal): ").strip() or "admin"
         if category not in ['admin', 'meetings', 'learning', 'personal']:
             category = 'admin'
         
@@ -1214,7 +1618,7 @@ class MasterJarvis:
         )
         
         priority_total = urgency + importance
-        priority_level = "🔥 HIGH" if priority_total >= 16 else "🟡 MEDIUM" if priority_total >= 12 else "🟢 LOW"
+        priority_level = PRIORITY_LEVELS[priority_total]
         
         print(f"\n✅ Recurring task created successfully!")
         print(f"🆔 Parent Task ID: {parent_task_id}")
@@ -1222,7 +1626,7 @@ class MasterJarvis:
         print(f"📅 Generated {instances_created} task instances")
         print(f"🎯 Priority: {priority_level} ({priority_total}/20)")
         
-        input("\n📱 Press Enter to continue...")
+        read_input("\n📱 Press Enter to continue...")
     
     def _generate_recurring_instances(self, parent_id, title, description, urgency, importance, 
                                     estimated_time, category, pattern, end_date, max_occurrences):
@@ -1232,13 +1636,12 @@ class MasterJarvis:
         start_date = datetime.now().date()
         current_date = start_date
         count = 0
+        end_dt = date.fromisoformat(end_date) if end_date else None
         
         # Generate instances based on pattern
         while count < (max_occurrences or 50):  # Cap at 50 if no end date
-            if end_date:
-                end_dt = datetime.strptime(end_date, "%Y-%m-%d").date()
-                if current_date > end_dt:
-                    break
+            if end_dt and current_date > end_dt:
+                break
             
             # Skip weekends for certain patterns (optional logic)
             if pattern == 'daily' and current_date.weekday() >= 5:  # Skip weekends for daily tasks
@@ -1253,7 +1656,7 @@ class MasterJarvis:
                 importance=importance,
                 estimated_time=estimated_time,
                 category=category,
-                due_date=current_date.strftime("%Y-%m-%d")
+                due_date=current_date.isoformat()
             )
             
             # Update task to mark as recurring instance
@@ -1298,14 +1701,14 @@ class MasterJarvis:
         if not tasks:
             print("📋 No pending tasks to schedule!")
             print("💡 Add tasks first using Option 1.")
-            input("\n📱 Press Enter to continue...")
+            read_input("\n📱 Press Enter to continue...")
             return
         
         print("📋 Your pending tasks:")
         for i, task in enumerate(tasks, 1):
             task_id, title, description, urgency, importance, est_time, actual_time, category, status, created_at, completed_at, due_date, energy_level, context, tags, priority_total = task
             
-            priority_level = "🔥" if priority_total >= 16 else "🟡" if priority_total >= 12 else "🟢"
+            priority_level = priority_icon_for(priority_total)
             time_str = f"⏱️ {est_time}h" if est_time else "⏱️ No estimate"
             
             print(f"  {i}. {priority_level} {title}")
@@ -1313,10 +1716,10 @@ class MasterJarvis:
         
         # Select task to schedule
         try:
-            task_choice = int(input(f"\n🔢 Select task number to schedule: ")) - 1
+            task_choice = int(read_input(f"\n🔢 Select task number to schedule: ")) - 1
             if not (0 <= task_choice < len(tasks)):
                 print("❌ Invalid task number!")
-                input("\n📱 Press Enter to continue...")
+                read_input("\n📱 Press Enter to continue...")
                 return
             
             selected_task = tasks[task_choice]
@@ -1334,7 +1737,7 @@ class MasterJarvis:
             self.visual.print_menu_option("6", "Saturday")
             self.visual.print_menu_option("7", "Sunday")
             
-            day_choice = input(f"\n{Fore.GREEN if VISUAL_AVAILABLE else ''}Select day (1-7): {Style.RESET_ALL if VISUAL_AVAILABLE else ''}").strip()
+            day_choice = read_input(f"\n{GREEN}Select day (1-7): {RESET}").strip()
             
             days = {
                 '1': 'Monday',
@@ -1348,7 +1751,7 @@ class MasterJarvis:
             
             if day_choice not in days:
                 print("❌ Invalid day selection!")
-                input("\n📱 Press Enter to continue...")
+                read_input("\n📱 Press Enter to continue...")
                 return
             
             selected_day = days[day_choice]
@@ -1358,35 +1761,34 @@ class MasterJarvis:
             self.visual.print_menu_option("1", f"Next {selected_day}")
             self.visual.print_menu_option("2", f"Specific date")
             
-            date_choice = input(f"\n{Fore.GREEN if VISUAL_AVAILABLE else ''}Choose option (1-2): {Style.RESET_ALL if VISUAL_AVAILABLE else ''}").strip()
+            date_choice = read_input(f"\n{GREEN}Choose option (1-2): {RESET}").strip()
             
             target_date = None
             
             if date_choice == '1':
                 # Find next occurrence of selected day
-                today = datetime.now()
-                days_ahead = list(days.keys()).index(day_choice) - today.weekday()
+                now = datetime.now()
+                days_ahead = (int(day_choice) - 1) - now.weekday()
                 if days_ahead <= 0:  # Target day already happened this week
                     days_ahead += 7
-                target_date = (today + timedelta(days=days_ahead)).strftime("%Y-%m-%d")
+                target_date = (now + timedelta(days=days_ahead)).strftime("%Y-%m-%d")
                 
             elif date_choice == '2':
                 # Get specific date
-                date_input = input("📅 Enter specific date (YYYY-MM-DD): ").strip()
+                date_input = read_input("📅 Enter specific date (YYYY-MM-DD): ").strip()
                 try:
-                    datetime.strptime(date_input, "%Y-%m-%d")
-                    target_date = date_input
+                    target_date = date.fromisoformat(date_input).isoformat()
                 except ValueError:
                     print("❌ Invalid date format!")
-                    input("\n📱 Press Enter to continue...")
+                    read_input("\n📱 Press Enter to continue...")
                     return
             else:
                 print("❌ Invalid choice!")
-                input("\n📱 Press Enter to continue...")
+                read_input("\n📱 Press Enter to continue...")
                 return
             
             # Get time slot (optional)
-            time_slot = input("🕒 Preferred time (e.g., '9:00 AM' or press Enter to skip): ").strip()
+            time_slot = read_input("🕒 Preferred time (e.g., '9:00 AM' or press Enter to skip): ").strip()
             
             # Update task with scheduled date
             conn = sqlite3.connect(self.db.db_path)
@@ -1417,18 +1819,7 @@ class MasterJarvis:
         except Exception as e:
             print(f"❌ Error scheduling task: {str(e)}")
         
-        input("\n📱 Press Enter to continue...")
-    
-    def _calculate_days_until_due(self, due_date, start_date):
-        """Calculate days between start_date and due_date"""
-        if not due_date:
-            return None
-        try:
-            due = datetime.strptime(due_date, "%Y-%m-%d")
-            start = datetime.strptime(start_date, "%Y-%m-%d")
-            return (due - start).days
-        except (ValueError, TypeError):
-            return None
+        read_input("\n📱 Press Enter to continue...")
     
     def show_smart_dashboard(self):
         """Display intelligent task dashboard"""
@@ -1438,63 +1829,68 @@ class MasterJarvis:
         
         if not tasks:
             print("🎉 No pending tasks! You're all caught up!")
-            input("\n📱 Press Enter to continue...")
+            read_input("\n📱 Press Enter to continue...")
             return
         
         print(f"📋 Showing {len(tasks)} pending tasks (sorted by priority):\n")
         
+        today = datetime.now().date()
+        lines = []
         for i, task in enumerate(tasks, 1):
             task_id, title, description, urgency, importance, est_time, actual_time, category, status, created_at, completed_at, due_date, energy_level, context, tags, priority_total = task
             
-            priority_level = "🔥" if priority_total >= 16 else "🟡" if priority_total >= 12 else "🟢"
+            priority_level = priority_icon_for(priority_total)
             time_str = f"⏱️ {est_time}h" if est_time else "⏱️ No estimate"
             
             # Add deadline information
             deadline_info = ""
-            if due_date:
-                try:
-                    due = datetime.strptime(due_date, "%Y-%m-%d")
-                    today = datetime.now()
-                    days_diff = (due - today).days
-                    
-                    if days_diff < 0:
-                        deadline_info = f" | 🚨 OVERDUE ({abs(days_diff)} days)"
-                        deadline_color = Fore.RED if VISUAL_AVAILABLE else ""
-                    elif days_diff == 0:
-                        deadline_info = f" | ⏰ DUE TODAY"
-                        deadline_color = Fore.RED if VISUAL_AVAILABLE else ""
-                    elif days_diff <= 3:
-                        deadline_info = f" | 📅 Due in {days_diff} days"
-                        deadline_color = Fore.YELLOW if VISUAL_AVAILABLE else ""
-                    elif days_diff <= 7:
-                        deadline_info = f" | 📆 Due {due_date}"
-                        deadline_color = Fore.CYAN if VISUAL_AVAILABLE else ""
-                    else:
-                        deadline_info = f" | 📅 Due {due_date}"
-                        deadline_color = ""
-                except ValueError:
+            due = _parse_ymd(due_date) if due_date else None
+            if due is not None:
+                days_diff = (due - today).days
+
+                if days_diff < 0:
+                    deadline_info = f" | 🚨 OVERDUE ({abs(days_diff)} days)"
+                    deadline_color = RED
+                elif days_diff == 0:
+                    deadline_info = f" | ⏰ DUE TODAY"
+                    deadline_color = RED
+                elif days_diff <= 3:
+                    deadline_info = f" | 📅 Due in {days_diff} days"
+                    deadline_color = YELLOW
+                elif days_diff <= 7:
+                    deadline_info = f" | 📆 Due {due_date}"
+                    deadline_color = CYAN
+                else:
                     deadline_info = f" | 📅 Due {due_date}"
                     deadline_color = ""
+            elif due_date:
+                # Unparseable deadline - show it as stored
+                deadline_info = f" | 📅 Due {due_date}"
+                deadline_color = ""
             else:
                 deadline_color = ""
             
             if VISUAL_AVAILABLE:
-                print(f"{Fore.YELLOW}{i:2d}.{Style.RESET_ALL} {priority_level} {deadline_color}{title}{Style.RESET_ALL}")
-                print(f"    🆔 ID: {task_id} | {time_str} | 📂 {category} | 🎯 Priority: {priority_total}/20{deadline_info}")
+                lines.append(f"{YELLOW}{i:2d}.{RESET} {priority_level} {deadline_color}{title}{RESET}")
+                lines.append(f"    🆔 ID: {task_id} | {time_str} | 📂 {category} | 🎯 Priority: {priority_total}/20{deadline_info}")
             else:
-                print(f"{i:2d}. {priority_level} {title}")
-                print(f"    ID: {task_id} | {time_str} | Category: {category} | Priority: {priority_total}/20{deadline_info}")
+                lines.append(f"{i:2d}. {priority_level} {title}")
+                lines.append(f"    ID: {task_id} | {time_str} | Category: {category} | Priority: {priority_total}/20{deadline_info}")
             
             if description:
-                print(f"    📝 {description}")
-            print()
+                lines.append(f"    📝 {description}")
+            lines.append("")
+        
+        # Emit the whole list in one write instead of several prints per task
+        sys.stdout.write("\n".join(lines) + "\n")
+        sys.stdout.flush()
         
         # AI optimization suggestions
         self.visual.print_ai_response("Analyzing your task list for optimization opportunities...", thinking=True)
         ai_suggestions = self.ai.suggest_schedule_optimization(tasks)
         self.visual.print_ai_response(ai_suggestions)
         
-        input("\n📱 Press Enter to continue...")
+        read_input("\n📱 Press Enter to continue...")
     
     def enhanced_ai_conversation(self):
         """Advanced AI conversation with memory"""
@@ -1506,7 +1902,7 @@ class MasterJarvis:
         
         while True:
             try:
-                user_input = input(f"{Fore.GREEN if VISUAL_AVAILABLE else ''}You: {Style.RESET_ALL if VISUAL_AVAILABLE else ''}").strip()
+                user_input = read_input(f"{GREEN}You: {RESET}").strip()
                 
                 if user_input.lower() in ['quit', 'exit', 'q', 'back']:
                     print("👋 Ending conversation. All insights saved!")
@@ -1568,7 +1964,7 @@ class MasterJarvis:
         print()
         
         while True:
-            user_input = input(f"{Fore.GREEN if VISUAL_AVAILABLE else ''}Scheduling request: {Style.RESET_ALL if VISUAL_AVAILABLE else ''}").strip()
+            user_input = read_input(f"{GREEN}Scheduling request: {RESET}").strip()
             
             if user_input.lower() in ['quit', 'exit', 'back', 'q']:
                 break
@@ -1582,7 +1978,7 @@ class MasterJarvis:
             self.visual.print_ai_response(ai_response)
             
             # Ask if they want to create the task
-            create_task = input("\n🤔 Would you like me to create this as a task? (y/n): ").strip().lower()
+            create_task = read_input("\n🤔 Would you like me to create this as a task? (y/n): ").strip().lower()
             
             if create_task == 'y':
                 # Extract task details and create
@@ -1621,12 +2017,12 @@ class MasterJarvis:
         
         # Show specific pattern data
         if patterns['completion_rates']:
-            print(f"\n{Fore.CYAN if VISUAL_AVAILABLE else ''}📊 Task Completion by Category:{Style.RESET_ALL if VISUAL_AVAILABLE else ''}")
+            print(f"\n{CYAN}📊 Task Completion by Category:{RESET}")
             for category, completed, total in patterns['completion_rates']:
                 completion_rate = (completed / total) * 100 if total > 0 else 0
                 print(f"  📂 {category}: {completed}/{total} ({completion_rate:.1f}%)")
         
-        input("\n📱 Press Enter to continue...")
+        read_input("\n📱 Press Enter to continue...")
     
     def daily_ai_briefing(self):
         """Generate daily AI briefing"""
@@ -1641,104 +2037,102 @@ class MasterJarvis:
         pending_tasks = self.db.get_tasks('pending', limit=5)
         
         if pending_tasks:
-            print(f"\n{Fore.CYAN if VISUAL_AVAILABLE else ''}🎯 Today's Top Priorities:{Style.RESET_ALL if VISUAL_AVAILABLE else ''}")
+            print(f"\n{CYAN}🎯 Today's Top Priorities:{RESET}")
             for i, task in enumerate(pending_tasks, 1):
-                priority_total = task[4] + task[5]  # urgency + importance
-                priority_icon = "🔥" if priority_total >= 16 else "🟡" if priority_total >= 12 else "🟢"
+                priority_total = task[15]  # urgency + importance, computed in SQL
+                priority_icon = priority_icon_for(priority_total)
                 print(f"  {i}. {priority_icon} {task[1]} (Priority: {priority_total}/20)")
         
-        input("\n📱 Press Enter to continue...")
+        read_input("\n📱 Press Enter to continue...")
     
     def complete_task(self):
         """Complete a task with time tracking"""
         self.visual.print_header("✅ COMPLETE TASK")
         
-        # Get ALL pending tasks, including recurring instances - simplified query
-        conn = sqlite3.connect(self.db.db_path)
-        cursor = conn.cursor()
-        cursor.execute('''
-            SELECT id, title, description, urgency_score, importance_score, 
-                   estimated_time, actual_time, category, status, created_at,
-                   completed_at, due_date, energy_level, context, tags
-            FROM tasks 
-            WHERE status = 'pending' 
-            ORDER BY created_at ASC
-        ''')
-        pending_tasks = cursor.fetchall()
-        conn.close()
+        # Get ALL pending tasks, including recurring instances, oldest first
+        pending_tasks = self.db.get_tasks_full('pending', order='created')
         
         if not pending_tasks:
             print("🎉 No pending tasks to complete!")
-            input("\n📱 Press Enter to continue...")
+            read_input("\n📱 Press Enter to continue...")
             return
         
         print(f"📋 Your pending tasks ({len(pending_tasks)} total):")
+        today = datetime.now().date()
+        lines = []
         for i, task in enumerate(pending_tasks, 1):
-            task_id = task[0]
-            title = task[1] 
-            due_date = task[11]
+            task_id = task.id
+            title = task.title
+            due_date = task.due_date
             
             # Add deadline info
             deadline_info = ""
-            if due_date:
-                try:
-                    due = datetime.strptime(due_date, "%Y-%m-%d")
-                    today = datetime.now()
-                    days_diff = (due - today).days
-                    
-                    if days_diff < 0:
-                        deadline_info = f" 🚨 OVERDUE"
-                    elif days_diff == 0:
-                        deadline_info = f" ⏰ DUE TODAY"
-                    elif days_diff <= 3:
-                        deadline_info = f" 📅 Due in {days_diff} days"
-                except ValueError:
-                    deadline_info = f" 📅 Due {due_date}"
+            due = _parse_ymd(due_date) if due_date else None
+            if due is not None:
+                days_diff = (due - today).days
+
+                if days_diff < 0:
+                    deadline_info = f" 🚨 OVERDUE"
+                elif days_diff == 0:
+                    deadline_info = f" ⏰ DUE TODAY"
+                elif days_diff <= 3:
+                    deadline_info = f" 📅 Due in {days_diff} days"
+            elif due_date:
+                deadline_info = f" 📅 Due {due_date}"
             
-            print(f"  {i}. {title} (ID: {task_id}){deadline_info}")
+            lines.append(f"  {i}. {title} (ID: {task_id}){deadline_info}")
         
-        try:
-            choice = int(input("\n🔢 Enter task number to complete: ")) - 1
-            if 0 <= choice < len(pending_tasks):
-                task = pending_tasks[choice]
-                task_id = task[0]
-                title = task[1]
-                estimated_time = task[5]
-                
-                print(f"\n✅ Completing: {title}")
-                
-                if estimated_time:
-                    actual_time_input = input(f"⏱️  Actual time spent? (estimated: {estimated_time}h): ").strip()
-                    try:
-                        actual_time = float(actual_time_input) if actual_time_input else None
-                    except ValueError:
-                        actual_time = None
-                else:
-                    actual_time_input = input("⏱️  How long did this take? (hours): ").strip()
-                    try:
-                        actual_time = float(actual_time_input) if actual_time_input else None
-                    except ValueError:
-                        actual_time = None
-                
-                self.db.complete_task(task_id, actual_time)
-                
-                print(f"🎉 Task completed successfully!")
-                
-                # AI learning from completion
-                if estimated_time and actual_time:
-                    difference = abs(estimated_time - actual_time)
-                    if difference > 0.5:  # If off by more than 30 minutes
-                        learning_prompt = f"I estimated {estimated_time}h for '{title}' but it took {actual_time}h. What can I learn for better estimates?"
-                        self.visual.print_ai_response("Learning from this completion...", thinking=True)
-                        ai_learning = self.ai.call_claude_api(learning_prompt, "task completion learning")
-                        self.visual.print_ai_response(ai_learning)
-                
+        sys.stdout.write("\n".join(lines) + "\n")
+        sys.stdout.flush()
+        
+        print(f"\n💡 Examples: '1' or '1,3,5' or '1-5'")
+        selection = read_input("🔢 Enter task number(s) to complete: ").strip()
+        task_indices = self._parse_task_selection(selection, len(pending_tasks)) if selection else []
+        
+        if not task_indices:
+            print("❌ Invalid task number!")
+            read_input("\n📱 Press Enter to continue...")
+            return
+        
+        completions = []
+        misestimates = []
+        for index in task_indices:
+            task = pending_tasks[index - 1]
+            estimated_time = task.estimated_time
+            
+            print(f"\n✅ Completing: {task.title}")
+            
+            if estimated_time:
+                actual_time_input = read_input(f"⏱️  Actual time spent? (estimated: {estimated_time}h): ").strip()
             else:
-                print("❌ Invalid task number!")
-        except ValueError:
-            print("❌ Please enter a valid number!")
+                actual_time_input = read_input("⏱️  How long did this take? (hours): ").strip()
+            try:
+                actual_time = float(actual_time_input) if actual_time_input else None
+            except ValueError:
+                actual_time = None
+            
+            completions.append((actual_time, task.id))
+            
+            # Off by more than 30 minutes - worth learning from
+            if estimated_time and actual_time and abs(estimated_time - actual_time) > 0.5:
+                misestimates.append(f"I estimated {estimated_time}h for '{task.title}' but it took {actual_time}h.")
+        
+        # All selected tasks are marked complete in one transaction
+        self.db.complete_tasks_bulk(completions)
+        
+        if len(completions) == 1:
+            print(f"🎉 Task completed successfully!")
+        else:
+            print(f"🎉 {len(completions)} tasks completed successfully!")
+        
+        # AI learning from completion
+        if misestimates:
+            learning_prompt = " ".join(misestimates) + " What can I learn for better estimates?"
+            self.visual.print_ai_response("Learning from this completion...", thinking=True)
+            ai_learning = self.ai.call_claude_api(learning_prompt, "task completion learning")
+            self.visual.print_ai_response(ai_learning)
         
-        input("\n📱 Press Enter to continue...")
+        read_input("\n📱 Press Enter to continue...")
     
     def run(self):
         """Main application loop"""
@@ -1749,45 +2143,14 @@ class MasterJarvis:
                 try:
                     self.show_main_menu()
                     
-                    choice = input(f"\n{Fore.GREEN if VISUAL_AVAILABLE else ''}Enter your choice: {Style.RESET_ALL if VISUAL_AVAILABLE else ''}").strip()
+                    choice = read_input(f"\n{GREEN}Enter your choice: {RESET}").strip()
                     
-                    if choice == '0':
+                    handler = self._menu.get(choice)
+                    if handler:
+                        handler()
+                    elif choice == '0':
                         self.visual.print_animated_text("👋 Thank you for using Master Jarvis! Your AI learns from every interaction.", color='blue')
                         break
-                    elif choice == '1':
-                        self.smart_task_manager()
-                    elif choice == '2':
-                        self.show_smart_dashboard()
-                    elif choice == '3':
-                        self.complete_task()
-                    elif choice == '4':
-                        self.delete_tasks()
-                    elif choice == '5':
-                        self.cleanup_recurring_tasks()
-                    elif choice == '6':
-                        self.enhanced_ai_conversation()
-                    elif choice == '7':
-                        self.ai_productivity_analysis()
-                    elif choice == '8':
-                        self.daily_ai_briefing()
-                    elif choice == '9':
-                        self.create_daily_schedule()
-                    elif choice == '10':
-                        self.manage_saved_schedules()
-                    elif choice == '11':
-                        self.export_calendar()
-                    elif choice == '12':
-                        self.schedule_task_specific_day()
-                    elif choice == '13':
-                        self.smart_weekly_planner()
-                    elif choice == '14':
-                        self.weekly_dashboard()
-                    elif choice == '15':
-                        self.export_weekly_calendar()
-                    elif choice == '16':
-                        self.show_system_analytics()
-                    elif choice == '17':
-                        self.manage_preferences()
                     else:
                         print("❌ Invalid choice! Please select a number from 0-17.")
                         time.sleep(1)
@@ -1797,10 +2160,12 @@ class MasterJarvis:
                     break
                 except Exception as e:
                     print(f"❌ Error: {str(e)}")
-                    input("📱 Press Enter to continue...")
+                    read_input("📱 Press Enter to continue...")
         
         except KeyboardInterrupt:
             print("\n👋 Goodbye!")
+        finally:
+            self.db.close()
     
     def delete_task(self):
         """Delete a task"""
@@ -1810,96 +2175,95 @@ class MasterJarvis:
         
         if not pending_tasks:
             print("📋 No pending tasks to delete!")
-            input("\n📱 Press Enter to continue...")
+            read_input("\n📱 Press Enter to continue...")
             return
         
         print("📋 Your pending tasks:")
         for i, task in enumerate(pending_tasks, 1):
             print(f"  {i}. {task[1]} (ID: {task[0]})")
         
-        try:
-            choice = int(input("\n🔢 Enter task number to delete: ")) - 1
-            if 0 <= choice < len(pending_tasks):
-                task = pending_tasks[choice]
-                task_id = task[0]
-                
-                confirm = input(f"⚠️  Really delete '{task[1]}'? (y/n): ").strip().lower()
-                if confirm == 'y':
-                    conn = sqlite3.connect(self.db.db_path)
-                    cursor = conn.cursor()
-                    cursor.execute("DELETE FROM tasks WHERE id = ?", (task_id,))
-                    conn.commit()
-                    conn.close()
-                    
+        selection = read_input("\n🔢 Enter task number(s) to delete (e.g. '1' or '1,3,5-7'): ").strip()
+        task_indices = self._parse_task_selection(selection, len(pending_tasks)) if selection else []
+
+        if task_indices:
+            selected_tasks = [pending_tasks[i - 1] for i in task_indices]
+            if len(selected_tasks) == 1:
+                prompt = f"⚠️  Really delete '{selected_tasks[0][1]}'? (y/n): "
+            else:
+                prompt = f"⚠️  Really delete {len(selected_tasks)} tasks? (y/n): "
+
+            confirm = read_input(prompt).strip().lower()
+            if confirm == 'y':
+                deleted_count = self.db.delete_tasks([task[0] for task in selected_tasks])
+
+                if deleted_count == 1:
                     print("✅ Task deleted successfully!")
                 else:
-                    print("❌ Deletion cancelled.")
+                    print(f"✅ Deleted {deleted_count} tasks successfully!")
             else:
-                print("❌ Invalid task number!")
-        except ValueError:
-            print("❌ Please enter a valid number!")
-        
-        input("\n📱 Press Enter to continue...")
+                print("❌ Deletion cancelled.")
+        else:
+            print("❌ Invalid task number!")
+
+        read_input("\n📱 Press Enter to continue...")
     
     def create_daily_schedule(self):
         """Create AI-optimized daily schedule"""
         self.visual.print_header("📋 CREATE DAILY SCHEDULE")
         
-        # Get pending tasks for scheduling
-        tasks = self.db.get_tasks('pending', limit=15)
+        # Get the top 8 pending tasks - the most a single day is scheduled with
+        tasks = self.db.get_top_priority_pending(limit=8)
         
         if not tasks:
             print("🎉 No pending tasks to schedule! You're all caught up!")
-            input("\n📱 Press Enter to continue...")
+            read_input("\n📱 Press Enter to continue...")
             return
         
         print("🤖 Creating AI-optimized daily schedule...\n")
         
         # Schedule configuration
         print("⚙️ Schedule Configuration:")
-        work_hours = input("⏰ Work hours (e.g., '9-17' for 9 AM to 5 PM): ").strip() or "9-17"
-        schedule_date = input("📅 Date (YYYY-MM-DD) or 'today': ").strip()
+        work_hours = read_input("⏰ Work hours (e.g., '9-17' for 9 AM to 5 PM): ").strip() or "9-17"
+        schedule_date = read_input("📅 Date (YYYY-MM-DD) or 'today': ").strip()
         
         if schedule_date.lower() == 'today' or not schedule_date:
-            schedule_date = datetime.now().strftime("%Y-%m-%d")
+            schedule_date = today_str()
         
-        try:
-            start_hour, end_hour = map(int, work_hours.split('-'))
-        except ValueError:
-            start_hour, end_hour = 9, 17
+        start_hour, end_hour = _parse_work_hours(work_hours)
         
         # AI schedule optimization
         self.visual.print_ai_response("Analyzing tasks and creating optimal schedule...", thinking=True)
         
-        # Process tasks safely with None handling
-        safe_tasks = []
-        for task in tasks:
-            # Unpack with safe defaults
-            (task_id, title, description, urgency, importance, est_time, actual_time, 
-             category, status, created_at, completed_at, due_date, energy_level, 
-             context, tags, priority_total) = task
-            
-            # Ensure all values are not None
-            urgency = urgency if urgency is not None else 5
-            importance = importance if importance is not None else 5
-            priority_total = priority_total if priority_total is not None else (urgency + importance)
-            est_time = est_time if est_time is not None else 1.0
-            category = category if category is not None else "general"
-            
-            safe_task = {
-                'id': task_id,
-                'title': title,
-                'description': description or "",
-                'urgency': urgency,
-                'importance': importance,
-                'priority_total': priority_total,
-                'est_time': est_time,
-                'category': category
+        # Defaults for missing fields are already filled in by the scheduling query
+        safe_tasks = [
+            {
+                'id': task.id,
+                'title': task.title,
+                'description': task.description,
+                'urgency': task.urgency_score,
+                'importance': task.importance_score,
+                'priority_total': task.priority_total,
+                'est_time': task.estimated_time,
+                'est_display': int(task.estimated_time * 10) / 10,  # one decimal for the prompt
+                'category': task.category
             }
-            safe_tasks.append(safe_task)
+            for task in tasks
+        ]
+        
+        # Nothing fits in the window - answer locally rather than asking the API
+        if not safe_tasks or start_hour >= end_hour:
+            if safe_tasks:
+                self.visual.print_ai_response(f"No working time between {start_hour}:00 and {end_hour}:00 — nothing to schedule.")
+            else:
+                self.visual.print_ai_response("Nothing to schedule — all done!")
+            read_input("\n📱 Press Enter to continue...")
+            return
         
         # Get AI scheduling recommendations
-        task_summary = "\n".join([f"- {task['title']} (Priority: {task['priority_total']}/20, Est: {task['est_time']}h)" for task in safe_tasks])
+        task_summary = "\n".join(
+            f"- {task['title']} (Priority: {task['priority_total']}/20, Est: {task['est_display']}h)"
+            for task in safe_tasks
+        )
         ai_prompt = f"""
         Create an optimized daily schedule for {schedule_date} from {start_hour}:00 to {end_hour}:00.
         
@@ -1918,7 +2282,7 @@ class MasterJarvis:
         ai_schedule = self.ai.call_claude_api(ai_prompt, "daily scheduling")
         
         # Create structured schedule
-        print(f"\n{Fore.CYAN if VISUAL_AVAILABLE else ''}🗓️ AI-Optimized Schedule for {schedule_date}:{Style.RESET_ALL if VISUAL_AVAILABLE else ''}")
+        print(f"\n{CYAN}🗓️ AI-Optimized Schedule for {schedule_date}:{RESET}")
         print("=" * 60)
         
         # Display AI recommendations
@@ -1928,9 +2292,9 @@ class MasterJarvis:
         current_hour = start_hour
         scheduled_tasks = []
         
-        print(f"\n{Fore.YELLOW if VISUAL_AVAILABLE else ''}⏰ Detailed Time Blocks:{Style.RESET_ALL if VISUAL_AVAILABLE else ''}")
+        print(f"\n{YELLOW}⏰ Detailed Time Blocks:{RESET}")
         
-        for i, task in enumerate(safe_tasks[:8]):  # Schedule top 8 priority tasks
+        for i, task in enumerate(safe_tasks):
             if current_hour >= end_hour:
                 break
             
@@ -1952,13 +2316,14 @@ class MasterJarvis:
             if time_needed < 0.5:  # Not enough time left
                 break
             
-            priority_icon = "🔥" if priority_total >= 16 else "🟡" if priority_total >= 12 else "🟢"
+            priority_icon = priority_icon_for(priority_total)
+            block = time_block_label(current_hour, end_time)
             
-            print(f"  {current_hour:02.0f}:{00:02.0f}-{end_time:02.0f}:{00:02.0f} {priority_icon} {title}")
+            print(f"  {block} {priority_icon} {title}")
             print(f"      📂 {category} | ⏱️ {time_needed:.1f}h | 🎯 Priority: {priority_total}/20")
             
             scheduled_tasks.append({
-                'time': f"{current_hour:02.0f}:{00:02.0f}-{end_time:02.0f}:{00:02.0f}",
+                'time': block,
                 'task': title,
                 'priority': priority_total,
                 'category': category
@@ -1967,15 +2332,15 @@ class MasterJarvis:
             current_hour = end_time + 0.25  # 15-minute buffer between tasks
         
         # Add breaks
-        print(f"\n{Fore.GREEN if VISUAL_AVAILABLE else ''}☕ Recommended Breaks:{Style.RESET_ALL if VISUAL_AVAILABLE else ''}")
+        print(f"\n{GREEN}☕ Recommended Breaks:{RESET}")
         print(f"  10:30-10:45 ☕ Coffee Break")
         print(f"  12:00-13:00 🍽️  Lunch Break") 
         print(f"  15:00-15:15 🚶 Afternoon Break")
         
         # Save schedule option
-        save_schedule = input(f"\n💾 Save this schedule? (y/n): ").strip().lower()
+        save_schedule = read_input(f"\n💾 Save this schedule? (y/n): ").strip().lower()
         if save_schedule == 'y':
-            schedule_name = input("📝 Schedule name: ").strip() or f"Schedule_{schedule_date}"
+            schedule_name = read_input("📝 Schedule name: ").strip() or f"Schedule_{schedule_date}"
             
             schedule_data = {
                 'date': schedule_date,
@@ -1986,39 +2351,48 @@ class MasterJarvis:
             
             # Save to database
             try:
-                conn = sqlite3.connect(self.db.db_path)
-                cursor = conn.cursor()
-                cursor.execute('''
-                    INSERT INTO schedules (name, schedule_date, schedule_data)
-                    VALUES (?, ?, ?)
-                ''', (schedule_name, schedule_date, json.dumps(schedule_data, cls=DateTimeEncoder)))
-                conn.commit()
-                conn.close()
+                with self.db.conn:
+                    self.db.conn.execute('''
+                        INSERT INTO schedules (name, schedule_date, schedule_data, kind)
+                        VALUES (?, ?, ?, 'daily')
+                    ''', (schedule_name, schedule_date, _json_dumps(schedule_data)))
                 
                 print(f"✅ Schedule '{schedule_name}' saved successfully!")
             except Exception as e:
                 print(f"⚠️ Schedule created but couldn't save: {str(e)}")
         
-        input("\n📱 Press Enter to continue...")
+        read_input("\n📱 Press Enter to continue...")
+    
+    def _load_schedule_data(self, schedule_id, created_at, schedule_data_str):
+        """Parsed schedule_data for a schedules row, decoded once per row version"""
+        cache = self._schedule_cache
+        cached = cache.pop(schedule_id, None)
+        if cached and cached[0] == created_at:
+            cache[schedule_id] = cached  # re-insert as most recently used
+            return cached[1]
+        
+        schedule_data = _json_loads(schedule_data_str)
+        cache[schedule_id] = (created_at, schedule_data)
+        if len(cache) > SCHEDULE_CACHE_SIZE:
+            del cache[next(iter(cache))]  # evict least recently used
+        return schedule_data
     
     def manage_saved_schedules(self):
         """Manage saved schedules"""
         self.visual.print_header("💾 SAVED SCHEDULES")
         
-        conn = sqlite3.connect(self.db.db_path)
-        cursor = conn.cursor()
+        cursor = self.db.conn.cursor()
         cursor.execute('''
             SELECT id, name, schedule_date, created_at 
             FROM schedules 
             ORDER BY created_at DESC
         ''')
         schedules = cursor.fetchall()
-        conn.close()
         
         if not schedules:
             print("📋 No saved schedules found.")
             print("💡 Create a daily schedule first to save it!")
-            input("\n📱 Press Enter to continue...")
+            read_input("\n📱 Press Enter to continue...")
             return
         
         print(f"📋 Your saved schedules ({len(schedules)} total):\n")
@@ -2027,19 +2401,19 @@ class MasterJarvis:
             print(f"  {i}. 📅 {name}")
             print(f"      📅 Date: {schedule_date} | 🕒 Created: {created_at[:16]}")
         
-        print(f"\n{Fore.CYAN if VISUAL_AVAILABLE else ''}Options:{Style.RESET_ALL if VISUAL_AVAILABLE else ''}")
+        print(f"\n{CYAN}Options:{RESET}")
         self.visual.print_menu_option("v", "View schedule details", "👁️")
         self.visual.print_menu_option("d", "Delete schedule", "🗑️")
         self.visual.print_menu_option("e", "Export schedule", "📤")
         self.visual.print_menu_option("q", "Back to main menu", "⬅️")
         
-        choice = input(f"\n{Fore.GREEN if VISUAL_AVAILABLE else ''}Enter choice: {Style.RESET_ALL if VISUAL_AVAILABLE else ''}").strip().lower()
+        choice = read_input(f"\n{GREEN}Enter choice: {RESET}").strip().lower()
         
         if choice == 'q':
             return
         elif choice == 'v':
             try:
-                schedule_num = int(input("Enter schedule number to view: ")) - 1
+                schedule_num = int(read_input("Enter schedule number to view: ")) - 1
                 if 0 <= schedule_num < len(schedules):
                     schedule_id = schedules[schedule_num][0]
                     self._view_schedule_details(schedule_id)
@@ -2049,16 +2423,15 @@ class MasterJarvis:
                 print("❌ Please enter a valid number!")
         elif choice == 'd':
             try:
-                schedule_num = int(input("Enter schedule number to delete: ")) - 1
+                schedule_num = int(read_input("Enter schedule number to delete: ")) - 1
                 if 0 <= schedule_num < len(schedules):
                     schedule_id, name = schedules[schedule_num][0], schedules[schedule_num][1]
-                    confirm = input(f"⚠️ Really delete '{name}'? (y/n): ").strip().lower()
+                    confirm = read_input(f"⚠️ Really delete '{name}'? (y/n): ").strip().lower()
                     if confirm == 'y':
-                        conn = sqlite3.connect(self.db.db_path)
-                        cursor = conn.cursor()
+                        cursor = self.db.conn.cursor()
                         cursor.execute("DELETE FROM schedules WHERE id = ?", (schedule_id,))
-                        conn.commit()
-                        conn.close()
+                        self.db.conn.commit()
+                        self._schedule_cache.pop(schedule_id, None)
                         print("✅ Schedule deleted successfully!")
                 else:
                     print("❌ Invalid schedule number!")
@@ -2066,7 +2439,7 @@ class MasterJarvis:
                 print("❌ Please enter a valid number!")
         elif choice == 'e':
             try:
-                schedule_num = int(input("Enter schedule number to export: ")) - 1
+                schedule_num = int(read_input("Enter schedule number to export: ")) - 1
                 if 0 <= schedule_num < len(schedules):
                     schedule_id = schedules[schedule_num][0]
                     self._export_schedule(schedule_id)
@@ -2075,181 +2448,165 @@ class MasterJarvis:
             except ValueError:
                 print("❌ Please enter a valid number!")
         
-        input("\n📱 Press Enter to continue...")
+        read_input("\n📱 Press Enter to continue...")
     
     def _view_schedule_details(self, schedule_id):
         """View detailed schedule information"""
-        conn = sqlite3.connect(self.db.db_path)
-        cursor = conn.cursor()
-        cursor.execute('''
-            SELECT name, schedule_date, schedule_data 
-            FROM schedules 
-            WHERE id = ?
-        ''', (schedule_id,))
+        cursor = self.db.conn.cursor()
+        cursor.execute(SCHEDULE_BY_ID_QUERY, (schedule_id,))
         result = cursor.fetchone()
-        conn.close()
         
         if not result:
             print("❌ Schedule not found!")
             return
         
-        name, schedule_date, schedule_data_str = result
-        schedule_data = json.loads(schedule_data_str)
+        name, schedule_date, schedule_data_str, created_at = result
+        schedule_data = self._load_schedule_data(schedule_id, created_at, schedule_data_str)
         
-        print(f"\n{Fore.CYAN if VISUAL_AVAILABLE else ''}📅 Schedule: {name}{Style.RESET_ALL if VISUAL_AVAILABLE else ''}")
+        print(f"\n{CYAN}📅 Schedule: {name}{RESET}")
         print(f"📅 Date: {schedule_date}")
         print(f"⏰ Work Hours: {schedule_data.get('work_hours', 'N/A')}")
         print("\n⏰ Time Blocks:")
         
+        lines = []
         for task in schedule_data.get('tasks', []):
-            priority_icon = "🔥" if task['priority'] >= 16 else "🟡" if task['priority'] >= 12 else "🟢"
-            print(f"  {task['time']} {priority_icon} {task['task']}")
-            print(f"      📂 {task['category']} | 🎯 Priority: {task['priority']}/20")
+            priority_icon = priority_icon_for(task['priority'])
+            lines.append(f"  {task['time']} {priority_icon} {task['task']}")
+            lines.append(f"      📂 {task['category']} | 🎯 Priority: {task['priority']}/20")
+        if lines:
+            sys.stdout.write("\n".join(lines) + "\n")
+            sys.stdout.flush()
         
         if 'ai_recommendations' in schedule_data:
-            print(f"\n{Fore.MAGENTA if VISUAL_AVAILABLE else ''}🤖 AI Recommendations:{Style.RESET_ALL if VISUAL_AVAILABLE else ''}")
+            print(f"\n{MAGENTA}🤖 AI Recommendations:{RESET}")
             print(schedule_data['ai_recommendations'][:300] + "..." if len(schedule_data['ai_recommendations']) > 300 else schedule_data['ai_recommendations'])
     
     def _export_schedule(self, schedule_id):
         """Export schedule in various formats"""
-        conn = sqlite3.connect(self.db.db_path)
-        cursor = conn.cursor()
-        cursor.execute('''
-            SELECT name, schedule_date, schedule_data 
-            FROM schedules 
-            WHERE id = ?
-        ''', (schedule_id,))
+        cursor = self.db.conn.cursor()
+        cursor.execute(SCHEDULE_BY_ID_QUERY, (schedule_id,))
         result = cursor.fetchone()
-        conn.close()
         
         if not result:
             print("❌ Schedule not found!")
             return
         
-        name, schedule_date, schedule_data_str = result
-        schedule_data = json.loads(schedule_data_str)
+        name, schedule_date, schedule_data_str, created_at = result
+        schedule_data = self._load_schedule_data(schedule_id, created_at, schedule_data_str)
         
         print(f"\n📤 Export Options for '{name}':")
         self.visual.print_menu_option("1", "Text format (.txt)")
         self.visual.print_menu_option("2", "Calendar format (.ics)")
         self.visual.print_menu_option("3", "HTML format (.html)")
+        self.visual.print_menu_option("4", "All formats")
         
-        export_choice = input(f"\n{Fore.GREEN if VISUAL_AVAILABLE else ''}Export format: {Style.RESET_ALL if VISUAL_AVAILABLE else ''}").strip()
+        export_choice = read_input(f"\n{GREEN}Export format: {RESET}").strip()
         
-        safe_filename = name.replace(' ', '_').replace('/', '_')
+        base_filename = f"data/{name.replace(' ', '_').replace('/', '_')}_{schedule_date}"
         
         if export_choice == '1':
-            # Text export
-            filename = f"data/{safe_filename}_{schedule_date}.txt"
-            with open(filename, 'w', encoding='utf-8') as f:
-                f.write(f"📅 {name}\n")
-                f.write(f"Date: {schedule_date}\n")
-                f.write(f"Work Hours: {schedule_data.get('work_hours', 'N/A')}\n\n")
-                f.write("⏰ SCHEDULE:\n")
-                f.write("=" * 50 + "\n")
-                
-                for task in schedule_data.get('tasks', []):
-                    f.write(f"{task['time']} - {task['task']}\n")
-                    f.write(f"    Category: {task['category']} | Priority: {task['priority']}/20\n\n")
-                
-                if 'ai_recommendations' in schedule_data:
-                    f.write("\n🤖 AI RECOMMENDATIONS:\n")
-                    f.write("=" * 50 + "\n")
-                    f.write(schedule_data['ai_recommendations'])
-            
+            filename = f"{base_filename}.txt"
+            self._export_daily_txt(filename, name, schedule_date, schedule_data)
             print(f"✅ Text schedule exported to: {filename}")
         
         elif export_choice == '2':
-            # ICS Calendar export
-            filename = f"data/{safe_filename}_{schedule_date}.ics"
-            with open(filename, 'w', encoding='utf-8') as f:
-                f.write("BEGIN:VCALENDAR\n")
-                f.write("VERSION:2.0\n")
-                f.write("PRODID:Jarvis AI Assistant\n")
-                
-                for task in schedule_data.get('tasks', []):
-                    start_time, end_time = task['time'].split('-')
-                    start_hour, start_min = map(int, start_time.split(':'))
-                    end_hour, end_min = map(int, end_time.split(':'))
-                    
-                    # Create datetime strings for ICS format
-                    dt = datetime.strptime(schedule_date, "%Y-%m-%d")
-                    start_dt = dt.replace(hour=start_hour, minute=start_min)
-                    end_dt = dt.replace(hour=end_hour, minute=end_min)
-                    
-                    f.write("BEGIN:VEVENT\n")
-                    f.write(f"DTSTART:{start_dt.strftime('%Y%m%dT%H%M%S')}\n")
-                    f.write(f"DTEND:{end_dt.strftime('%Y%m%dT%H%M%S')}\n")
-                    f.write(f"SUMMARY:{task['task']}\n")
-                    f.write(f"DESCRIPTION:Category: {task['category']} | Priority: {task['priority']}/20\n")
-                    f.write("END:VEVENT\n")
-                
-                f.write("END:VCALENDAR\n")
-            
+            filename = f"{base_filename}.ics"
+            self._export_daily_ics(filename, name, schedule_date, schedule_data)
             print(f"✅ Calendar file exported to: {filename}")
             print("📱 Import this .ics file into Outlook, Google Calendar, or Apple Calendar")
         
         elif export_choice == '3':
-            # HTML export
-            filename = f"data/{safe_filename}_{schedule_date}.html"
-            with open(filename, 'w', encoding='utf-8') as f:
-                f.write(f"""
-<!DOCTYPE html>
-<html>
-<head>
-    <title>{name} - {schedule_date}</title>
-    <style>
-        body {{ font-family: Arial, sans-serif; margin: 20px; }}
-        .header {{ color: #2c3e50; border-bottom: 2px solid #3498db; padding-bottom: 10px; }}
-        .schedule-item {{ margin: 10px 0; padding: 10px; background: #f8f9fa; border-left: 4px solid #3498db; }}
-        .time {{ font-weight: bold; color: #2c3e50; }}
-        .task {{ font-size: 1.1em; color: #34495e; }}
-        .details {{ color: #7f8c8d; font-size: 0.9em; }}
-        .high-priority {{ border-left-color: #e74c3c; }}
-        .medium-priority {{ border-left-color: #f39c12; }}
-        .low-priority {{ border-left-color: #27ae60; }}
-    </style>
-</head>
-<body>
-    <div class="header">
-        <h1>📅 {name}</h1>
-        <p>Date: {schedule_date} | Work Hours: {schedule_data.get('work_hours', 'N/A')}</p>
-    </div>
-""")
-                
-                for task in schedule_data.get('tasks', []):
-                    priority_class = "high-priority" if task['priority'] >= 16 else "medium-priority" if task['priority'] >= 12 else "low-priority"
-                    priority_icon = "🔥" if task['priority'] >= 16 else "🟡" if task['priority'] >= 12 else "🟢"
-                    
-                    f.write(f"""
-    <div class="schedule-item {priority_class}">
-        <div class="time">{task['time']}</div>
-        <div class="task">{priority_icon} {task['task']}</div>
-        <div class="details">📂 {task['category']} | 🎯 Priority: {task['priority']}/20</div>
-    </div>
-""")
-                
-                if 'ai_recommendations' in schedule_data:
-                    f.write(f"""
-    <div class="header" style="margin-top: 30px;">
-        <h2>🤖 AI Recommendations</h2>
-    </div>
-    <div style="background: #e8f6f3; padding: 15px; border-radius: 5px;">
-        <p>{schedule_data['ai_recommendations']}</p>
-    </div>
-""")
-                
-                f.write("""
-</body>
-</html>
-""")
-            
+            filename = f"{base_filename}.html"
+            self._export_daily_html(filename, name, schedule_date, schedule_data)
             print(f"✅ HTML schedule exported to: {filename}")
             print("🌐 Open this file in your web browser for a beautiful printable schedule")
         
+        elif export_choice == '4':
+            # The three files are independent, so write them side by side
+            jobs = [
+                (self._export_daily_txt, f"{base_filename}.txt"),
+                (self._export_daily_ics, f"{base_filename}.ics"),
+                (self._export_daily_html, f"{base_filename}.html"),
+            ]
+            with concurrent.futures.ThreadPoolExecutor(max_workers=len(jobs)) as pool:
+                futures = [pool.submit(export, filename, name, schedule_date, schedule_data)
+                           for export, filename in jobs]
+                for future in futures:
+                    future.result()  # Re-raise any write error here
+            
+            print("✅ Schedule exported in all formats:")
+            for _, filename in jobs:
+                print(f"   • {filename}")
+        
         else:
             print("❌ Invalid export choice!")
     
+    def _export_daily_txt(self, filename, name, schedule_date, schedule_data):
+        """Write a saved daily schedule as plain text"""
+        with io.StringIO() as buf:
+            buf.write(f"📅 {name}\n")
+            buf.write(f"Date: {schedule_date}\n")
+            buf.write(f"Work Hours: {schedule_data.get('work_hours', 'N/A')}\n\n")
+            buf.write("⏰ SCHEDULE:\n")
+            buf.write("=" * 50 + "\n")
+            
+            for task in schedule_data.get('tasks', []):
+                buf.write(f"{task['time']} - {task['task']}\n")
+                buf.write(f"    Category: {task['category']} | Priority: {task['priority']}/20\n\n")
+            
+            if 'ai_recommendations' in schedule_data:
+                buf.write("\n🤖 AI RECOMMENDATIONS:\n")
+                buf.write("=" * 50 + "\n")
+                buf.write(schedule_data['ai_recommendations'])
+            
+            with open(filename, 'w', encoding='utf-8', buffering=EXPORT_BUFFER_SIZE) as f:
+                f.write(buf.getvalue())
+    
+    def _export_daily_ics(self, filename, name, schedule_date, schedule_data):
+        """Write a saved daily schedule as an ICS calendar"""
+        with io.StringIO() as buf:
+            buf.write(ICS_HEADER)
+            
+            # Every event falls on the schedule's date: validate and format it once,
+            # then build each ICS timestamp straight from the parsed HH:MM
+            ymd = datetime.strptime(schedule_date, "%Y-%m-%d").strftime("%Y%m%d")
+            
+            for task in schedule_data.get('tasks', []):
+                start_time, end_time = task['time'].split('-')
+                start_hour, start_min = _parse_hhmm(start_time)
+                end_hour, end_min = _parse_hhmm(end_time)
+                
+                buf.write(ICS_EVENT_TMPL.format(
+                    s=f"{ymd}T{start_hour:02d}{start_min:02d}00", e=f"{ymd}T{end_hour:02d}{end_min:02d}00",
+                    t=task['task'], c=task['category'], p=task['priority'], notes=''
+                ))
+            
+            buf.write(ICS_FOOTER)
+            
+            with open(filename, 'w', encoding='utf-8', buffering=EXPORT_BUFFER_SIZE) as f:
+                f.write(buf.getvalue())
+    
+    def _export_daily_html(self, filename, name, schedule_date, schedule_data):
+        """Write a saved daily schedule as a printable HTML page"""
+        parts = [HTML_HEADER_TMPL.format(
+            name=name, date=schedule_date, work_hours=schedule_data.get('work_hours', 'N/A')
+        )]
+        
+        for task in schedule_data.get('tasks', []):
+            parts.append(HTML_ITEM_TMPL.format(
+                priority_class=priority_class_for(task['priority']), time=task['time'],
+                icon=priority_icon_for(task['priority']),
+                task=task['task'], category=task['category'], priority=task['priority']
+            ))
+        
+        if 'ai_recommendations' in schedule_data:
+            parts.append(HTML_AI_TMPL.format(recommendations=schedule_data['ai_recommendations']))
+        
+        parts.append(HTML_FOOTER)
+        
+        with open(filename, 'w', encoding='utf-8', buffering=EXPORT_BUFFER_SIZE) as f:
+            f.write(''.join(parts))
+    
     def export_calendar(self):
         """Export calendar - unified entry point"""
         self.visual.print_header("📤 EXPORT CALENDAR")
@@ -2259,7 +2616,7 @@ class MasterJarvis:
         self.visual.print_menu_option("2", "Export current tasks as calendar")
         self.visual.print_menu_option("3", "Create & export new schedule")
         
-        choice = input(f"\n{Fore.GREEN if VISUAL_AVAILABLE else ''}Enter choice: {Style.RESET_ALL if VISUAL_AVAILABLE else ''}").strip()
+        choice = read_input(f"\n{GREEN}Enter choice: {RESET}").strip()
         
         if choice == '1':
             self.manage_saved_schedules()
@@ -2270,7 +2627,7 @@ class MasterJarvis:
         else:
             print("❌ Invalid choice!")
         
-        input("\n📱 Press Enter to continue...")
+        read_input("\n📱 Press Enter to continue...")
     
     def _export_tasks_as_calendar(self):
         """Export current tasks as calendar events"""
@@ -2280,44 +2637,37 @@ class MasterJarvis:
             print("📋 No pending tasks to export!")
             return
         
-        schedule_date = input("📅 Date for tasks (YYYY-MM-DD) or 'today': ").strip()
+        schedule_date = read_input("📅 Date for tasks (YYYY-MM-DD) or 'today': ").strip()
         if schedule_date.lower() == 'today' or not schedule_date:
-            schedule_date = datetime.now().strftime("%Y-%m-%d")
+            schedule_date = today_str()
         
         filename = f"data/tasks_calendar_{schedule_date}.ics"
         
-        with open(filename, 'w', encoding='utf-8') as f:
-            f.write("BEGIN:VCALENDAR\n")
-            f.write("VERSION:2.0\n")
-            f.write("PRODID:Jarvis AI Assistant\n")
-            
-            current_hour = 9  # Start at 9 AM
-            
-            for task in tasks:
-                task_id, title, description, urgency, importance, est_time, actual_time, category, status, created_at, completed_at, due_date, energy_level, context, tags, priority_total = task
-                
-                # Default 1 hour if no estimate
-                duration = est_time or 1.0
-                
-                dt = datetime.strptime(schedule_date, "%Y-%m-%d")
-                start_dt = dt.replace(hour=current_hour, minute=0)
-                end_dt = dt.replace(hour=current_hour + int(duration), minute=int((duration % 1) * 60))
-                
-                f.write("BEGIN:VEVENT\n")
-                f.write(f"DTSTART:{start_dt.strftime('%Y%m%dT%H%M%S')}\n")
-                f.write(f"DTEND:{end_dt.strftime('%Y%m%dT%H%M%S')}\n")
-                f.write(f"SUMMARY:{title}\n")
-                f.write(f"DESCRIPTION:Category: {category} | Priority: {priority_total}/20")
-                if description:
-                    f.write(f" | Notes: {description}")
-                f.write("\n")
-                f.write("END:VEVENT\n")
-                
-                current_hour += max(1, int(duration))
-                if current_hour >= 17:  # Don't go past 5 PM
-                    break
-            
-            f.write("END:VCALENDAR\n")
+        events = []
+        current_hour = 9  # Start at 9 AM
+        ymd = datetime.strptime(schedule_date, "%Y-%m-%d").strftime("%Y%m%d")
+        
+        for task in tasks:
+            # Default 1 hour if no estimate
+            duration = task.estimated_time or 1.0
+            
+            # End of day caps long estimates rather than rolling past midnight
+            end_hour, end_min = current_hour + int(duration), int((duration % 1) * 60)
+            if end_hour > 23:
+                end_hour, end_min = 23, 59
+            
+            events.append(ICS_EVENT_TMPL.format(
+                s=f"{ymd}T{current_hour:02d}0000", e=f"{ymd}T{end_hour:02d}{end_min:02d}00",
+                t=task.title, c=task.category, p=task.priority_total,
+                notes=f" | Notes: {task.description}" if task.description else ''
+            ))
+            
+            current_hour += max(1, int(duration))
+            if current_hour >= 17:  # Don't go past 5 PM
+                break
+        
+        with open(filename, 'w', encoding='utf-8', buffering=EXPORT_BUFFER_SIZE) as f:
+            f.write(ICS_HEADER + "".join(events) + ICS_FOOTER)
         
         print(f"✅ Tasks exported to calendar: {filename}")
         print("📱 Import this .ics file into your calendar app")
@@ -2331,14 +2681,14 @@ class MasterJarvis:
         
         if not tasks:
             print("🎉 No pending tasks to schedule! You're all caught up!")
-            input("\n📱 Press Enter to continue...")
+            read_input("\n📱 Press Enter to continue...")
             return
         
         print(f"📋 Found {len(tasks)} tasks to schedule across the week")
         
         # Weekly planning configuration
         print("\n⚙️ Weekly Planning Configuration:")
-        start_date = input("📅 Week starting date (YYYY-MM-DD) or 'this week': ").strip()
+        start_date = read_input("📅 Week starting date (YYYY-MM-DD) or 'this week': ").strip()
         
         if start_date.lower() == 'this week' or not start_date:
             # Get Monday of current week
@@ -2347,50 +2697,40 @@ class MasterJarvis:
             monday = today - timedelta(days=days_since_monday)
             start_date = monday.strftime("%Y-%m-%d")
         
-        work_hours = input("⏰ Daily work hours (e.g., '9-17'): ").strip() or "9-17"
-        try:
-            start_hour, end_hour = map(int, work_hours.split('-'))
-            daily_hours = end_hour - start_hour
-        except ValueError:
-            start_hour, end_hour = 9, 17
-            daily_hours = 8
+        work_hours = read_input("⏰ Daily work hours (e.g., '9-17'): ").strip() or "9-17"
+        start_hour, end_hour = _parse_work_hours(work_hours)
+        daily_hours = end_hour - start_hour
         
         # Weekly goals and focus areas
         print(f"\n🎯 Weekly Focus Areas:")
-        weekly_goals = input("📝 Main goals for this week (optional): ").strip()
-        priority_focus = input("🔥 Priority focus (high/medium/low): ").strip().lower() or "high"
+        weekly_goals = read_input("📝 Main goals for this week (optional): ").strip()
+        priority_focus = read_input("🔥 Priority focus (high/medium/low): ").strip().lower() or "high"
         
         # Process tasks safely for weekly planning
         safe_tasks = []
         total_estimated_hours = 0
+        week_start = _parse_ymd(start_date)  # Parsed once; due dates are diffed against it
         
         for task in tasks:
-            (task_id, title, description, urgency, importance, est_time, actual_time, 
-             category, status, created_at, completed_at, due_date, energy_level, 
-             context, tags, priority_total) = task
-            
-            # Safe defaults
-            urgency = urgency if urgency is not None else 5
-            importance = importance if importance is not None else 5
-            priority_total = priority_total if priority_total is not None else (urgency + importance)
-            est_time = est_time if est_time is not None else 1.5
-            category = category if category is not None else "general"
-            energy_level = energy_level if energy_level is not None else "medium"
+            # Urgency, importance and priority_total already come back defaulted from SQL
+            est_time = task.estimated_time if task.estimated_time is not None else 1.5
+            due_date = task.due_date
+            due = _parse_ymd(due_date) if due_date else None
             
             total_estimated_hours += est_time
             
             safe_task = {
-                'id': task_id,
-                'title': title,
-                'description': description or "",
-                'urgency': urgency,
-                'importance': importance,
-                'priority_total': priority_total,
+                'id': task.id,
+                'title': task.title,
+                'description': task.description or "",
+                'urgency': task.urgency_score,
+                'importance': task.importance_score,
+                'priority_total': task.priority_total,
                 'est_time': est_time,
-                'category': category,
-                'energy_level': energy_level,
+                'category': task.category if task.category is not None else "general",
+                'energy_level': task.energy_level if task.energy_level is not None else "medium",
                 'due_date': due_date,
-                'days_until_due': self._calculate_days_until_due(due_date, start_date) if due_date else None
+                'days_until_due': (due - week_start).days if due and week_start else None
             }
             safe_tasks.append(safe_task)
         
@@ -2428,7 +2768,7 @@ class MasterJarvis:
         ai_weekly_analysis = self.ai.call_claude_api(ai_prompt, "weekly planning")
         
         # Display AI analysis
-        print(f"\n{Fore.CYAN if VISUAL_AVAILABLE else ''}🧠 AI Weekly Analysis:{Style.RESET_ALL if VISUAL_AVAILABLE else ''}")
+        print(f"\n{CYAN}🧠 AI Weekly Analysis:{RESET}")
         self.visual.print_ai_response(ai_weekly_analysis)
         
         # Generate weekly schedule
@@ -2438,9 +2778,9 @@ class MasterJarvis:
         self._display_weekly_overview(weekly_schedule, start_date)
         
         # Save weekly schedule option
-        save_weekly = input(f"\n💾 Save this weekly schedule? (y/n): ").strip().lower()
+        save_weekly = read_input(f"\n💾 Save this weekly schedule? (y/n): ").strip().lower()
         if save_weekly == 'y':
-            schedule_name = input("📝 Weekly schedule name: ").strip() or f"Week_{start_date}"
+            schedule_name = read_input("📝 Weekly schedule name: ").strip() or f"Week_{start_date}"
             
             weekly_data = {
                 'start_date': start_date,
@@ -2452,21 +2792,21 @@ class MasterJarvis:
                 'total_hours': total_estimated_hours
             }
             
+            # weekly_data only references the structures built above, so encoding it in one
+            # shot is cheapest; an iterencode() stream would fall back to the pure-Python
+            # encoder and SQLite needs the whole string anyway
             try:
-                conn = sqlite3.connect(self.db.db_path)
-                cursor = conn.cursor()
-                cursor.execute('''
-                    INSERT INTO schedules (name, schedule_date, schedule_data)
-                    VALUES (?, ?, ?)
-                ''', (schedule_name, start_date, json.dumps(weekly_data, cls=DateTimeEncoder)))
-                conn.commit()
-                conn.close()
+                with self.db.conn:
+                    self.db.conn.execute('''
+                        INSERT INTO schedules (name, schedule_date, schedule_data, kind)
+                        VALUES (?, ?, ?, 'weekly')
+                    ''', (schedule_name, start_date, _json_dumps(weekly_data)))
                 
                 print(f"✅ Weekly schedule '{schedule_name}' saved successfully!")
             except Exception as e:
                 print(f"⚠️ Weekly schedule created but couldn't save: {str(e)}")
         
-        input("\n📱 Press Enter to continue...")
+        read_input("\n📱 Press Enter to continue...")
     
     def _generate_weekly_schedule(self, tasks, start_date, start_hour, end_hour):
         """Generate deadline-aware optimized weekly schedule from tasks"""
@@ -2492,10 +2832,11 @@ class MasterJarvis:
         weekly_schedule = {}
         weekdays = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday']
         
+        week_start = datetime.strptime(start_date, "%Y-%m-%d")
         for i, day in enumerate(weekdays):
-            date = datetime.strptime(start_date, "%Y-%m-%d") + timedelta(days=i)
+            day_date = week_start + timedelta(days=i)
             weekly_schedule[day] = {
-                'date': date.strftime("%Y-%m-%d"),
+                'date': day_date.strftime("%Y-%m-%d"),
                 'tasks': [],
                 'total_hours': 0,
                 'focus_theme': '',
@@ -2506,9 +2847,14 @@ class MasterJarvis:
         deadline_warnings = []
         daily_capacity = (end_hour - start_hour) * 0.8  # 80% utilization
         
+        # Min-heap of (hours booked, day index, day) for least-loaded lookups; entries
+        # go stale when a day is booked and are skipped lazily in _find_best_day_for_task
+        load_heap = [(0, i, day) for i, day in enumerate(weekdays)]
+        heapq.heapify(load_heap)
+        
         # Distribute tasks with deadline awareness
         for task in sorted_tasks:
-            best_day = self._find_best_day_for_task(task, weekly_schedule, weekdays, daily_capacity, start_date)
+            best_day = self._find_best_day_for_task(task, weekly_schedule, weekdays, daily_capacity, load_heap)
             
             if best_day:
                 day_schedule = weekly_schedule[best_day]
@@ -2522,9 +2868,10 @@ class MasterJarvis:
                     'energy_level': task['energy_level'],
                     'due_date': task['due_date'],
                     'days_until_due': task['days_until_due'],
-                    'deadline_status': self._get_deadline_status(task['days_until_due'])
+                    'deadline_status': deadline_status_for(task['days_until_due'])
                 })
                 day_schedule['total_hours'] += task['est_time']
+                heapq.heappush(load_heap, (day_schedule['total_hours'], weekdays.index(best_day), best_day))
                 
                 # Check for deadline conflicts
                 if task['days_until_due'] is not None and task['days_until_due'] <= 3:
@@ -2536,8 +2883,7 @@ class MasterJarvis:
         # Assign daily focus themes based on scheduled tasks
         for day, schedule in weekly_schedule.items():
             if schedule['tasks']:
-                categories = [task['category'] for task in schedule['tasks']]
-                main_category = max(set(categories), key=categories.count)
+                main_category = Counter(task['category'] for task in schedule['tasks']).most_common(1)[0][0]
                 
                 # Check for deadline-focused days
                 urgent_tasks = [t for t in schedule['tasks'] if t.get('deadline_status') == 'urgent']
@@ -2552,55 +2898,41 @@ class MasterJarvis:
         
         return weekly_schedule
     
-    def _find_best_day_for_task(self, task, weekly_schedule, weekdays, daily_capacity, start_date):
+    def _find_best_day_for_task(self, task, weekly_schedule, weekdays, daily_capacity, load_heap):
         """Find the best day to schedule a task considering deadlines and capacity"""
         
         # If task has a deadline, try to schedule it appropriately
         if task['days_until_due'] is not None:
-            target_day_index = min(task['days_until_due'], 4)  # Cap at Friday (index 4)
+            target_day_index = min(max(task['days_until_due'], 0), len(weekdays) - 1)  # Overdue -> Monday, cap at Friday
             
-            # Try to schedule on or before the target day
-            for day_offset in range(max(0, target_day_index - 1), min(len(weekdays), target_day_index + 2)):
-                if day_offset < len(weekdays):
-                    day_name = weekdays[day_offset]
-                    day_schedule = weekly_schedule[day_name]
-                    
-                    # Check if task fits
-                    if day_schedule['total_hours'] + task['est_time'] <= daily_capacity:
-                        return day_name
-        
-        # No deadline constraints - find best available day
-        for day_name in weekdays:
-            day_schedule = weekly_schedule[day_name]
-            if day_schedule['total_hours'] + task['est_time'] <= daily_capacity:
-                return day_name
+            # Try the day before through the day after the target, then any earlier day
+            window_start = max(0, target_day_index - 1)
+            candidates = list(range(window_start, min(len(weekdays), target_day_index + 2))) + list(range(window_start))
+            for day_offset in candidates:
+                day_name = weekdays[day_offset]
+                
+                # Check if task fits
+                if weekly_schedule[day_name]['total_hours'] + task['est_time'] <= daily_capacity:
+                    return day_name
         
-        # All days full - put in least full day
-        least_full_day = min(weekdays, key=lambda d: weekly_schedule[d]['total_hours'])
-        return least_full_day
-    
-    def _get_deadline_status(self, days_until_due):
-        """Get deadline status for color coding and alerts"""
-        if days_until_due is None:
-            return 'none'
-        elif days_until_due <= 0:
-            return 'overdue'
-        elif days_until_due <= 1:
-            return 'urgent'
-        elif days_until_due <= 3:
-            return 'approaching'
-        elif days_until_due <= 7:
-            return 'thisweek'
-        else:
-            return 'future'
+        # No deadline constraints (or no room near it) - least loaded day, which is
+        # also the least full day when nothing has room left
+        while True:
+            hours, _, day_name = load_heap[0]
+            if hours == weekly_schedule[day_name]['total_hours']:
+                return day_name
+            heapq.heappop(load_heap)  # Stale entry for a day booked since
     
     def _display_weekly_overview(self, weekly_schedule, start_date):
         """Display beautiful weekly schedule overview with deadline awareness"""
         
-        print(f"\n{Fore.CYAN if VISUAL_AVAILABLE else ''}🗓️ WEEKLY SCHEDULE OVERVIEW{Style.RESET_ALL if VISUAL_AVAILABLE else ''}")
+        print(f"\n{CYAN}🗓️ WEEKLY SCHEDULE OVERVIEW{RESET}")
         print("=" * 80)
         
+        # Weekly totals, all gathered in the single pass over the days below
         total_week_hours = 0
+        total_tasks = 0
+        deadline_tasks = 0
         deadline_alerts = []
         
         for day, schedule in weekly_schedule.items():
@@ -2611,109 +2943,79 @@ class MasterJarvis:
             formatted_date = date_obj.strftime("%m/%d")
             
             total_week_hours += schedule['total_hours']
+            total_tasks += len(schedule['tasks'])
             
             # Collect deadline alerts
             deadline_alerts.extend(schedule.get('deadline_alerts', []))
             
             # Day header with workload color coding
-            if VISUAL_AVAILABLE:
-                if schedule['total_hours'] > 6:
-                    day_color = Fore.RED  # Heavy day
-                elif schedule['total_hours'] > 4:
-                    day_color = Fore.YELLOW  # Moderate day
-                else:
-                    day_color = Fore.GREEN  # Light day
-                
-                print(f"\n{day_color}📅 {day} ({formatted_date}) - {schedule['focus_theme']}{Style.RESET_ALL}")
-                print(f"{day_color}⏱️ Total: {schedule['total_hours']:.1f} hours{Style.RESET_ALL}")
+            if schedule['total_hours'] > 6:
+                day_color = RED  # Heavy day
+            elif schedule['total_hours'] > 4:
+                day_color = YELLOW  # Moderate day
             else:
-                print(f"\n📅 {day} ({formatted_date}) - {schedule['focus_theme']}")
-                print(f"⏱️ Total: {schedule['total_hours']:.1f} hours")
+                day_color = GREEN  # Light day
+            
+            print(f"\n{day_color}📅 {day} ({formatted_date}) - {schedule['focus_theme']}{RESET}")
+            print(f"{day_color}⏱️ Total: {schedule['total_hours']:.1f} hours{RESET}")
             
             # Task list for the day with deadline indicators
             if schedule['tasks']:
                 for i, task in enumerate(schedule['tasks'], 1):
                     # Priority indicators
-                    priority_icon = "🔥" if task['priority'] >= 16 else "🟡" if task['priority'] >= 12 else "🟢"
-                    energy_icon = "⚡" if task['energy_level'] == 'high' else "🔋" if task['energy_level'] == 'medium' else "💤"
+                    priority_icon = priority_icon_for(task['priority'])
+                    energy_icon = ENERGY_ICONS.get(task['energy_level'], LOW_ENERGY_ICON)
                     
                     # Deadline indicators
                     deadline_status = task.get('deadline_status', 'none')
-                    deadline_icon = ""
-                    deadline_color = ""
-                    
+                    deadline_color = DEADLINE_COLORS.get(deadline_status, "")
                     if VISUAL_AVAILABLE:
-                        if deadline_status == 'overdue':
-                            deadline_icon = "🚨"
-                            deadline_color = Fore.RED
-                        elif deadline_status == 'urgent':
-                            deadline_icon = "⏰"
-                            deadline_color = Fore.RED
-                        elif deadline_status == 'approaching':
-                            deadline_icon = "📅"
-                            deadline_color = Fore.YELLOW
-                        elif deadline_status == 'thisweek':
-                            deadline_icon = "📆"
-                            deadline_color = Fore.CYAN
+                        deadline_icon = DEADLINE_ICONS.get(deadline_status, "")
                     else:
-                        if deadline_status == 'overdue':
-                            deadline_icon = "[OVERDUE]"
-                        elif deadline_status == 'urgent':
-                            deadline_icon = "[URGENT]"
-                        elif deadline_status == 'approaching':
-                            deadline_icon = "[DUE SOON]"
-                        elif deadline_status == 'thisweek':
-                            deadline_icon = "[THIS WEEK]"
+                        deadline_icon = DEADLINE_TAGS.get(deadline_status, "")
                     
-                    # Display task with deadline info
-                    task_line = f"  {i}. {priority_icon} {task['title']}"
+                    # Display task with deadline info (colour constants are empty without colorama)
                     if deadline_icon:
-                        if VISUAL_AVAILABLE:
-                            task_line += f" {deadline_color}{deadline_icon}{Style.RESET_ALL}"
-                        else:
-                            task_line += f" {deadline_icon}"
-                    
-                    print(task_line)
+                        print(f"  {i}. {priority_icon} {task['title']}", f"{deadline_color}{deadline_icon}{RESET}")
+                    else:
+                        print(f"  {i}. {priority_icon} {task['title']}")
                     
                     # Task details
                     details = f"     ⏱️ {task['est_time']}h | 📂 {task['category']} | {energy_icon} {task['energy_level']}"
                     if task.get('due_date'):
                         details += f" | 📅 Due: {task['due_date']}"
+                        deadline_tasks += 1
                     print(details)
             else:
                 print("  🎉 Light day - perfect for catch-up or planning!")
         
         # Show deadline alerts
         if deadline_alerts:
-            print(f"\n{Fore.RED if VISUAL_AVAILABLE else ''}🚨 DEADLINE ALERTS:{Style.RESET_ALL if VISUAL_AVAILABLE else ''}")
+            print(f"\n{RED}🚨 DEADLINE ALERTS:{RESET}")
             for alert in deadline_alerts:
                 print(f"   {alert}")
         
         # Show scheduling warnings
         if '_warnings' in weekly_schedule:
-            print(f"\n{Fore.YELLOW if VISUAL_AVAILABLE else ''}⚠️ SCHEDULING WARNINGS:{Style.RESET_ALL if VISUAL_AVAILABLE else ''}")
+            print(f"\n{YELLOW}⚠️ SCHEDULING WARNINGS:{RESET}")
             for warning in weekly_schedule['_warnings']:
                 print(f"   {warning}")
         
         # Weekly summary
-        print(f"\n{Fore.CYAN if VISUAL_AVAILABLE else ''}📊 WEEKLY SUMMARY:{Style.RESET_ALL if VISUAL_AVAILABLE else ''}")
+        print(f"\n{CYAN}📊 WEEKLY SUMMARY:{RESET}")
         print(f"⏱️ Total planned hours: {total_week_hours:.1f}")
         print(f"📈 Daily average: {total_week_hours/5:.1f} hours")
         print(f"📅 Deadline-critical tasks: {len(deadline_alerts)}")
         
         # Workload assessment
         if total_week_hours > 35:
-            print(f"⚠️ {Fore.RED if VISUAL_AVAILABLE else ''}High workload week - consider delegating or rescheduling{Style.RESET_ALL if VISUAL_AVAILABLE else ''}")
+            print(f"⚠️ {RED}High workload week - consider delegating or rescheduling{RESET}")
         elif total_week_hours < 20:
-            print(f"🎯 {Fore.GREEN if VISUAL_AVAILABLE else ''}Light week - good opportunity for strategic projects{Style.RESET_ALL if VISUAL_AVAILABLE else ''}")
+            print(f"🎯 {GREEN}Light week - good opportunity for strategic projects{RESET}")
         else:
-            print(f"✅ {Fore.GREEN if VISUAL_AVAILABLE else ''}Well-balanced week!{Style.RESET_ALL if VISUAL_AVAILABLE else ''}")
+            print(f"✅ {GREEN}Well-balanced week!{RESET}")
         
         # Deadline distribution analysis
-        total_tasks = sum(len(schedule['tasks']) for schedule in weekly_schedule.values() if not isinstance(schedule, list))
-        deadline_tasks = sum(1 for schedule in weekly_schedule.values() if not isinstance(schedule, list) 
-                           for task in schedule['tasks'] if task.get('due_date'))
-        
         if deadline_tasks > 0:
             print(f"📅 Tasks with deadlines: {deadline_tasks}/{total_tasks} ({deadline_tasks/total_tasks*100:.0f}%)")
     
@@ -2722,56 +3024,41 @@ class MasterJarvis:
         self.visual.print_header("📊 WEEKLY DASHBOARD")
         
         # Get saved weekly schedules
-        conn = sqlite3.connect(self.db.db_path)
-        cursor = conn.cursor()
-        cursor.execute('''
-            SELECT id, name, schedule_date, schedule_data, created_at
-            FROM schedules 
-            WHERE name LIKE 'Week_%' OR schedule_data LIKE '%weekly_goals%'
-            ORDER BY created_at DESC
-            LIMIT 5
-        ''')
+        cursor = self.db.conn.cursor()
+        cursor.execute(WEEKLY_SCHEDULES_QUERY, (5,))
         weekly_schedules = cursor.fetchall()
-        conn.close()
         
         if not weekly_schedules:
             print("📋 No weekly schedules found.")
             print("💡 Create a weekly schedule first using option 14!")
-            input("\n📱 Press Enter to continue...")
+            read_input("\n📱 Press Enter to continue...")
             return
         
         print(f"📊 Weekly Schedules Dashboard ({len(weekly_schedules)} recent weeks):\n")
         
+        # The query only returns rows whose schedule_data holds a "schedule" object
         for i, (schedule_id, name, schedule_date, schedule_data_str, created_at) in enumerate(weekly_schedules, 1):
-            try:
-                schedule_data = json.loads(schedule_data_str)
-                
-                # Check if it's actually weekly data
-                if 'schedule' in schedule_data and isinstance(schedule_data['schedule'], dict):
-                    total_hours = schedule_data.get('total_hours', 0)
-                    weekly_goals = schedule_data.get('weekly_goals', 'N/A')
-                    
-                    print(f"  {i}. 📅 {name}")
-                    print(f"      📅 Week of: {schedule_date}")
-                    print(f"      ⏱️ Total hours: {total_hours:.1f}")
-                    print(f"      🎯 Goals: {weekly_goals[:50]}{'...' if len(weekly_goals) > 50 else ''}")
-                    print(f"      📝 Created: {created_at[:16]}")
-                    print()
-                    
-            except (json.JSONDecodeError, KeyError):
-                # Skip non-weekly schedules
-                continue
+            schedule_data = self._load_schedule_data(schedule_id, created_at, schedule_data_str)
+            total_hours = schedule_data.get('total_hours', 0)
+            weekly_goals = schedule_data.get('weekly_goals', 'N/A')
+            
+            print(f"  {i}. 📅 {name}")
+            print(f"      📅 Week of: {schedule_date}")
+            print(f"      ⏱️ Total hours: {total_hours:.1f}")
+            print(f"      🎯 Goals: {weekly_goals[:50]}{'...' if len(weekly_goals) > 50 else ''}")
+            print(f"      📝 Created: {created_at[:16]}")
+            print()
         
-        print(f"{Fore.CYAN if VISUAL_AVAILABLE else ''}Options:{Style.RESET_ALL if VISUAL_AVAILABLE else ''}")
+        print(f"{CYAN}Options:{RESET}")
         self.visual.print_menu_option("v", "View detailed weekly schedule", "👁️")
         self.visual.print_menu_option("a", "Weekly analytics comparison", "📈")
         self.visual.print_menu_option("q", "Back to main menu", "⬅️")
         
-        choice = input(f"\n{Fore.GREEN if VISUAL_AVAILABLE else ''}Enter choice: {Style.RESET_ALL if VISUAL_AVAILABLE else ''}").strip().lower()
+        choice = read_input(f"\n{GREEN}Enter choice: {RESET}").strip().lower()
         
         if choice == 'v':
             try:
-                week_num = int(input("Enter week number to view: ")) - 1
+                week_num = int(read_input("Enter week number to view: ")) - 1
                 if 0 <= week_num < len(weekly_schedules):
                     self._view_weekly_details(weekly_schedules[week_num])
                 else:
@@ -2781,16 +3068,16 @@ class MasterJarvis:
         elif choice == 'a':
             self._show_weekly_analytics(weekly_schedules)
         
-        input("\n📱 Press Enter to continue...")
+        read_input("\n📱 Press Enter to continue...")
     
     def _view_weekly_details(self, schedule_tuple):
         """View detailed weekly schedule"""
         schedule_id, name, schedule_date, schedule_data_str, created_at = schedule_tuple
         
         try:
-            schedule_data = json.loads(schedule_data_str)
+            schedule_data = self._load_schedule_data(schedule_id, created_at, schedule_data_str)
             
-            print(f"\n{Fore.CYAN if VISUAL_AVAILABLE else ''}📅 Weekly Schedule: {name}{Style.RESET_ALL if VISUAL_AVAILABLE else ''}")
+            print(f"\n{CYAN}📅 Weekly Schedule: {name}{RESET}")
             print(f"📅 Week of: {schedule_date}")
             print(f"🎯 Goals: {schedule_data.get('weekly_goals', 'N/A')}")
             print(f"⏰ Work hours: {schedule_data.get('work_hours', 'N/A')}")
@@ -2800,7 +3087,7 @@ class MasterJarvis:
                 self._display_weekly_overview(schedule_data['schedule'], schedule_date)
             
             if 'ai_analysis' in schedule_data:
-                print(f"\n{Fore.MAGENTA if VISUAL_AVAILABLE else ''}🤖 AI Analysis:{Style.RESET_ALL if VISUAL_AVAILABLE else ''}")
+                print(f"\n{MAGENTA}🤖 AI Analysis:{RESET}")
                 print(schedule_data['ai_analysis'])
                 
         except (json.JSONDecodeError, KeyError) as e:
@@ -2808,90 +3095,66 @@ class MasterJarvis:
     
     def _show_weekly_analytics(self, weekly_schedules):
         """Show analytics across multiple weeks"""
-        print(f"\n{Fore.CYAN if VISUAL_AVAILABLE else ''}📈 WEEKLY ANALYTICS{Style.RESET_ALL if VISUAL_AVAILABLE else ''}")
+        print(f"\n{CYAN}📈 WEEKLY ANALYTICS{RESET}")
         
-        total_weeks = 0
-        total_hours = 0
-        weekly_hours = []
+        # Collect the hours first, then reduce with the C builtins
+        schedules = (self._load_schedule_data(schedule_id, created_at, schedule_data_str)
+                     for schedule_id, _, _, schedule_data_str, created_at in weekly_schedules)
+        weekly_hours = [schedule_data['total_hours'] for schedule_data in schedules
+                        if 'total_hours' in schedule_data]
         
-        for schedule_tuple in weekly_schedules:
-            try:
-                schedule_data = json.loads(schedule_tuple[3])
-                if 'total_hours' in schedule_data:
-                    hours = schedule_data['total_hours']
-                    total_hours += hours
-                    weekly_hours.append(hours)
-                    total_weeks += 1
-            except (json.JSONDecodeError, KeyError):
-                continue
+        if not weekly_hours:
+            print("📊 No weekly data available for analytics")
+            return
         
-        if total_weeks > 0:
-            avg_hours = total_hours / total_weeks
-            min_hours = min(weekly_hours)
-            max_hours = max(weekly_hours)
-            
-            print(f"📊 Analytics for {total_weeks} weeks:")
-            print(f"   ⏱️ Average weekly hours: {avg_hours:.1f}")
-            print(f"   📈 Highest week: {max_hours:.1f} hours")
-            print(f"   📉 Lightest week: {min_hours:.1f} hours")
-            print(f"   📊 Total planned: {total_hours:.1f} hours")
-            
-            # Productivity insights
-            if avg_hours > 35:
-                print(f"   💡 {Fore.YELLOW if VISUAL_AVAILABLE else ''}Trend: High workload weeks - consider workload balancing{Style.RESET_ALL if VISUAL_AVAILABLE else ''}")
-            elif avg_hours < 25:
-                print(f"   💡 {Fore.GREEN if VISUAL_AVAILABLE else ''}Trend: Sustainable pace - good work-life balance{Style.RESET_ALL if VISUAL_AVAILABLE else ''}")
-            else:
-                print(f"   💡 {Fore.GREEN if VISUAL_AVAILABLE else ''}Trend: Well-balanced weekly planning{Style.RESET_ALL if VISUAL_AVAILABLE else ''}")
+        total_weeks = len(weekly_hours)
+        total_hours = sum(weekly_hours)
+        avg_hours = total_hours / total_weeks
+        
+        print(f"📊 Analytics for {total_weeks} weeks:")
+        print(f"   ⏱️ Average weekly hours: {avg_hours:.1f}")
+        print(f"   📈 Highest week: {max(weekly_hours):.1f} hours")
+        print(f"   📉 Lightest week: {min(weekly_hours):.1f} hours")
+        print(f"   📊 Total planned: {total_hours:.1f} hours")
+        
+        # Productivity insights
+        if avg_hours > 35:
+            print(f"   💡 {YELLOW}Trend: High workload weeks - consider workload balancing{RESET}")
+        elif avg_hours < 25:
+            print(f"   💡 {GREEN}Trend: Sustainable pace - good work-life balance{RESET}")
         else:
-            print("📊 No weekly data available for analytics")
+            print(f"   💡 {GREEN}Trend: Well-balanced weekly planning{RESET}")
     
     def export_weekly_calendar(self):
         """Export weekly schedules in various formats"""
         self.visual.print_header("📤 EXPORT WEEKLY CALENDAR")
         
         # Get weekly schedules
-        conn = sqlite3.connect(self.db.db_path)
-        cursor = conn.cursor()
-        cursor.execute('''
-            SELECT id, name, schedule_date, schedule_data
-            FROM schedules 
-            WHERE name LIKE 'Week_%' OR schedule_data LIKE '%weekly_goals%'
-            ORDER BY created_at DESC
-            LIMIT 10
-        ''')
+        cursor = self.db.conn.cursor()
+        cursor.execute(WEEKLY_SCHEDULES_QUERY, (10,))
         weekly_schedules = cursor.fetchall()
-        conn.close()
         
         if not weekly_schedules:
             print("📋 No weekly schedules found to export.")
             print("💡 Create a weekly schedule first using option 14!")
-            input("\n📱 Press Enter to continue...")
+            read_input("\n📱 Press Enter to continue...")
             return
         
         print(f"📋 Available weekly schedules:\n")
         
+        # The query only returns rows whose schedule_data holds a "schedule" object
         valid_schedules = []
-        for i, (schedule_id, name, schedule_date, schedule_data_str) in enumerate(weekly_schedules, 1):
-            try:
-                schedule_data = json.loads(schedule_data_str)
-                if 'schedule' in schedule_data:
-                    print(f"  {i}. 📅 {name} (Week of {schedule_date})")
-                    valid_schedules.append((schedule_id, name, schedule_date, schedule_data))
-            except json.JSONDecodeError:
-                continue
-        
-        if not valid_schedules:
-            print("❌ No valid weekly schedules found!")
-            input("\n📱 Press Enter to continue...")
-            return
+        for i, (schedule_id, name, schedule_date, schedule_data_str, created_at) in enumerate(weekly_schedules, 1):
+            schedule_data = self._load_schedule_data(schedule_id, created_at, schedule_data_str)
+            print(f"  {i}. 📅 {name} (Week of {schedule_date})")
+            valid_schedules.append((schedule_id, name, schedule_date, schedule_data))
         
         try:
-            selection_input = input(f"\n{Fore.GREEN if VISUAL_AVAILABLE else ''}Select weekly schedule to export: {Style.RESET_ALL if VISUAL_AVAILABLE else ''}").strip()
+            selection_input = read_input(f"\n{GREEN}Select weekly schedule to export: {RESET}").strip()
             
             if not selection_input:
                 print("❌ No selection made!")
-                input("\n📱 Press Enter to continue...")
+                read_input("\n📱 Press Enter to continue...")
                 return
             
             choice = int(selection_input) - 1
@@ -2906,7 +3169,7 @@ class MasterJarvis:
         except Exception as e:
             print(f"❌ Export error: {str(e)}")
         
-        input("\n📱 Press Enter to continue...")
+        read_input("\n📱 Press Enter to continue...")
     
     def _export_weekly_schedule(self, name, start_date, schedule_data):
         """Export weekly schedule in multiple formats"""
@@ -2917,10 +3180,7 @@ class MasterJarvis:
         self.visual.print_menu_option("3", "Weekly Planner (.txt) - Simple text format")
         self.visual.print_menu_option("4", "All formats")
         
-        export_choice = input(f"\n{Fore.GREEN if VISUAL_AVAILABLE else ''}Export format: {Style.RESET_ALL if VISUAL_AVAILABLE else ''}").strip()
-        
-        # Debug output to see what we're getting
-        print(f"Debug: You entered '{export_choice}' (length: {len(export_choice)})")
+        export_choice = read_input(f"\n{GREEN}Export format: {RESET}").strip()
         
         safe_name = name.replace(' ', '_').replace('/', '_')
         exported_files = []
@@ -2956,9 +3216,15 @@ class MasterJarvis:
         elif export_choice == '4':
             print("📊 Exporting all formats...")
             try:
-                self._export_weekly_ics(safe_name, start_date, schedule_data)
-                self._export_weekly_html(safe_name, start_date, schedule_data)
-                self._export_weekly_txt(safe_name, start_date, schedule_data)
+                # Walk the schedule once and hand the same day list to every writer;
+                # the three files are independent, so write them side by side
+                days = weekly_days(schedule_data)
+                exports = (self._export_weekly_ics, self._export_weekly_html, self._export_weekly_txt)
+                with concurrent.futures.ThreadPoolExecutor(max_workers=len(exports)) as pool:
+                    futures = [pool.submit(export, safe_name, start_date, schedule_data, days)
+                               for export in exports]
+                    for future in futures:
+                        future.result()  # Re-raise any write error here
                 exported_files = ["ICS Calendar", "HTML Overview", "Text Planner"]
             except Exception as e:
                 print(f"❌ Error creating files: {str(e)}")
@@ -2978,109 +3244,85 @@ class MasterJarvis:
         print(f"💡 Look for files starting with: {safe_name}_weekly_{start_date}")
         
         # Show the actual file path
-        import os
-        data_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data')
-        print(f"📍 Full path: {data_path}")
+        print(f"📍 Full path: {self._data_dir}")
         
         # List files that were created
         try:
-            import os
-            if os.path.exists('data'):
-                files = [f for f in os.listdir('data') if f.startswith(safe_name)]
-                if files:
-                    print(f"📋 Created files:")
-                    for file in files:
-                        print(f"   • {file}")
-                else:
-                    print("⚠️ No files found in data folder")
+            files = [f for f in os.listdir(self._data_dir) if f.startswith(safe_name)]
+            if files:
+                print(f"📋 Created files:")
+                for file in files:
+                    print(f"   • {file}")
             else:
-                print("⚠️ Data folder does not exist - creating it now")
-                os.makedirs('data', exist_ok=True)
+                print("⚠️ No files found in data folder")
         except Exception as e:
             print(f"📁 File listing error: {str(e)}")
     
-    def _export_weekly_ics(self, name, start_date, schedule_data):
+    def _export_weekly_ics(self, name, start_date, schedule_data, days=None):
         """Export weekly schedule as ICS calendar file"""
-        filename = f"data/{name}_weekly_{start_date}.ics"
+        filename = os.path.join(self._data_dir, f"{name}_weekly_{start_date}.ics")
+        
+        if days is None:
+            days = weekly_days(schedule_data)
         
         try:
-            with open(filename, 'w', encoding='utf-8') as f:
-                f.write("BEGIN:VCALENDAR\n")
-                f.write("VERSION:2.0\n")
-                f.write("PRODID:Jarvis AI Assistant - Weekly Planner\n")
-                
-                weekly_schedule = schedule_data.get('schedule', {})
-                work_hours = schedule_data.get('work_hours', '9-17')
-                
-                try:
-                    start_hour = int(work_hours.split('-')[0])
-                except (ValueError, IndexError):
-                    start_hour = 9  # Default fallback
+            start_hour, _ = _parse_work_hours(schedule_data.get('work_hours', '9-17'))
+            if start_hour > 23:
+                start_hour = 17  # Keep the first slot inside the day
+            
+            with io.StringIO() as buf:
+                buf.write("BEGIN:VCALENDAR\nVERSION:2.0\nPRODID:Jarvis AI Assistant - Weekly Planner\n")
                 
-                for day_name, day_schedule in weekly_schedule.items():
-                    if day_name.startswith('_'):  # Skip metadata
-                        continue
-                        
+                event_seq = 0  # makes UIDs unique within the export
+                for day_name, day_schedule in days:
                     if day_schedule.get('tasks'):
-                        date_str = day_schedule['date']
+                        # Parse the day once; every event on it shares the date part
+                        try:
+                            ymd = datetime.strptime(day_schedule['date'], "%Y-%m-%d").strftime("%Y%m%d")
+                        except ValueError as e:
+                            print(f"⚠️ Skipping {day_name} - datetime error: {str(e)}")
+                            continue
                         current_hour = start_hour
                         
                         for task in day_schedule['tasks']:
-                            # Calculate time slots with bounds checking
-                            task_duration = task.get('est_time', 1.0)
+                            # Whole hours move the end hour (capped at 23), the fraction
+                            # becomes minutes; a [0, 1) fraction always gives 0-59
+                            duration_hours, duration_frac = divmod(task.get('est_time', 1.0), 1)
+                            end_hour = min(current_hour + int(duration_hours), 23)
+                            end_minute = int(duration_frac * 60)
                             
-                            # Ensure current_hour is within valid range
-                            if current_hour < 0:
-                                current_hour = 9
-                            elif current_hour > 23:
-                                current_hour = 17
+                            # Generate unique event ID
+                            event_seq += 1
+                            event_id = f"jarvis-{ymd}{current_hour:02d}0000-{event_seq}"
                             
-                            # Calculate end hour, ensuring it doesn't exceed 23
-                            end_hour = min(current_hour + int(task_duration), 23)
-                            end_minute = int((task_duration % 1) * 60)
+                            # Build description with available info
+                            desc_parts = []
+                            if task.get('category'):
+                                desc_parts.append(f"Category: {task['category']}")
+                            if task.get('priority'):
+                                desc_parts.append(f"Priority: {task['priority']}/20")
+                            if task.get('energy_level'):
+                                desc_parts.append(f"Energy: {task['energy_level']}")
+                            description = f"DESCRIPTION:{' | '.join(desc_parts)}\n" if desc_parts else ""
                             
-                            # Ensure end_minute is within valid range
-                            if end_minute >= 60:
-                                end_minute = 59
-                            elif end_minute < 0:
-                                end_minute = 0
+                            # One write per event
+                            buf.write(
+                                f"BEGIN:VEVENT\n"
+                                f"UID:{event_id}@jarvis-ai-assistant\n"
+                                f"DTSTART:{ymd}T{current_hour:02d}0000\n"
+                                f"DTEND:{ymd}T{end_hour:02d}{end_minute:02d}00\n"
+                                f"SUMMARY:{task.get('title', 'Untitled Task')}\n"
+                                f"{description}"
+                                f"END:VEVENT\n"
+                            )
                             
-                            try:
-                                dt = datetime.strptime(date_str, "%Y-%m-%d")
-                                start_dt = dt.replace(hour=current_hour, minute=0)
-                                end_dt = dt.replace(hour=end_hour, minute=end_minute)
-                                
-                                # Generate unique event ID
-                                event_id = f"jarvis-{start_dt.strftime('%Y%m%d%H%M%S')}-{hash(task['title']) % 10000}"
-                                
-                                f.write("BEGIN:VEVENT\n")
-                                f.write(f"UID:{event_id}@jarvis-ai-assistant\n")
-                                f.write(f"DTSTART:{start_dt.strftime('%Y%m%dT%H%M%S')}\n")
-                                f.write(f"DTEND:{end_dt.strftime('%Y%m%dT%H%M%S')}\n")
-                                f.write(f"SUMMARY:{task.get('title', 'Untitled Task')}\n")
-                                
-                                # Build description with available info
-                                desc_parts = []
-                                if task.get('category'):
-                                    desc_parts.append(f"Category: {task['category']}")
-                                if task.get('priority'):
-                                    desc_parts.append(f"Priority: {task['priority']}/20")
-                                if task.get('energy_level'):
-                                    desc_parts.append(f"Energy: {task['energy_level']}")
-                                
-                                if desc_parts:
-                                    f.write(f"DESCRIPTION:{' | '.join(desc_parts)}\n")
-                                
-                                f.write("END:VEVENT\n")
-                                
-                                # Move to next time slot, ensuring we don't exceed day boundaries
-                                current_hour = min(end_hour + 1, 23)
-                                
-                            except (ValueError, OverflowError) as e:
-                                print(f"⚠️ Skipping task '{task.get('title', 'Unknown')}' - datetime error: {str(e)}")
-                                continue
+                            # Move to next time slot, staying between the day's start and 23:00
+                            current_hour = min(max(end_hour + 1, start_hour), 23)
                 
-                f.write("END:VCALENDAR\n")
+                buf.write("END:VCALENDAR\n")
+                
+                with open(filename, 'w', encoding='utf-8', buffering=EXPORT_BUFFER_SIZE) as f:
+                    f.write(buf.getvalue())
             
             print(f"✅ Weekly calendar exported: {filename}")
             return True
@@ -3090,143 +3332,103 @@ class MasterJarvis:
             print(f"💡 This might be due to invalid schedule data or file permissions.")
             return False
     
-    def _export_weekly_html(self, name, start_date, schedule_data):
+    def _export_weekly_html(self, name, start_date, schedule_data, days=None):
         """Export weekly schedule as HTML"""
-        filename = f"data/{name}_weekly_{start_date}.html"
+        filename = os.path.join(self._data_dir, f"{name}_weekly_{start_date}.html")
         
-        with open(filename, 'w', encoding='utf-8') as f:
-            f.write(f"""
-<!DOCTYPE html>
-<html>
-<head>
-    <title>{name} - Weekly Schedule</title>
-    <style>
-        body {{ font-family: Arial, sans-serif; margin: 20px; }}
-        .header {{ color: #2c3e50; border-bottom: 3px solid #3498db; padding-bottom: 15px; margin-bottom: 20px; }}
-        .week-overview {{ display: grid; grid-template-columns: repeat(5, 1fr); gap: 15px; margin: 20px 0; }}
-        .day-card {{ border: 2px solid #ecf0f1; border-radius: 8px; padding: 15px; background: #f8f9fa; }}
-        .day-header {{ font-weight: bold; color: #2c3e50; border-bottom: 1px solid #bdc3c7; padding-bottom: 8px; margin-bottom: 10px; }}
-        .task-item {{ margin: 8px 0; padding: 8px; border-radius: 4px; }}
-        .high-priority {{ background: #ffeaa7; border-left: 4px solid #e17055; }}
-        .medium-priority {{ background: #fab1a0; border-left: 4px solid #fd79a8; }}
-        .low-priority {{ background: #a4f7c0; border-left: 4px solid #00b894; }}
-        .task-details {{ font-size: 0.85em; color: #636e72; margin-top: 4px; }}
-        .weekly-summary {{ background: #e8f6f3; padding: 20px; border-radius: 8px; margin: 20px 0; }}
-        .goals {{ background: #ffeaa7; padding: 15px; border-radius: 8px; margin: 15px 0; }}
-    </style>
-</head>
-<body>
-    <div class="header">
-        <h1>🗓️ {name}</h1>
-        <p>📅 Week of {start_date} | ⏰ Work Hours: {schedule_data.get('work_hours', 'N/A')} | ⏱️ Total: {schedule_data.get('total_hours', 0):.1f} hours</p>
-    </div>
-""")
-            
-            # Weekly goals
-            if schedule_data.get('weekly_goals'):
-                f.write(f"""
-    <div class="goals">
-        <h3>🎯 Weekly Goals</h3>
-        <p>{schedule_data['weekly_goals']}</p>
-    </div>
-""")
-            
-            # Weekly overview
-            f.write('<div class="week-overview">')
-            
-            weekly_schedule = schedule_data.get('schedule', {})
-            weekdays = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday']
-            
-            for day in weekdays:
-                if day in weekly_schedule:
-                    day_schedule = weekly_schedule[day]
-                    day_date = day_schedule.get('date', '')
-                    
-                    f.write(f"""
-        <div class="day-card">
-            <div class="day-header">📅 {day}<br><small>{day_date}</small></div>
-            <div><strong>{day_schedule.get('focus_theme', '')}</strong></div>
-            <div>⏱️ {day_schedule.get('total_hours', 0):.1f} hours</div>
-""")
-                    
-                    for task in day_schedule.get('tasks', []):
-                        priority_class = "high-priority" if task['priority'] >= 16 else "medium-priority" if task['priority'] >= 12 else "low-priority"
-                        priority_icon = "🔥" if task['priority'] >= 16 else "🟡" if task['priority'] >= 12 else "🟢"
-                        energy_icon = "⚡" if task['energy_level'] == 'high' else "🔋" if task['energy_level'] == 'medium' else "💤"
-                        
-                        f.write(f"""
-            <div class="task-item {priority_class}">
-                <div>{priority_icon} {task['title']}</div>
-                <div class="task-details">⏱️ {task['est_time']}h | 📂 {task['category']} | {energy_icon}</div>
-            </div>
-""")
-                    
-                    f.write('        </div>')
-            
-            f.write('</div>')
-            
-            # Weekly summary
-            f.write(f"""
-    <div class="weekly-summary">
-        <h3>📊 Weekly Summary</h3>
-        <p>⏱️ Total planned hours: {schedule_data.get('total_hours', 0):.1f}</p>
-        <p>📈 Daily average: {schedule_data.get('total_hours', 0)/5:.1f} hours</p>
-        <p>🎯 Priority focus: {schedule_data.get('priority_focus', 'N/A').title()}</p>
-    </div>
-""")
+        if days is None:
+            days = weekly_days(schedule_data)
+        
+        # Format the week total once; the header and the summary both show it
+        total_hours = float(schedule_data.get('total_hours', 0))
+        total_hours_str = f"{total_hours:.1f}"
+        
+        parts = [WEEKLY_HTML_HEADER_TMPL.format(
+            name=name, start_date=start_date,
+            work_hours=schedule_data.get('work_hours', 'N/A'), total_hours=total_hours_str
+        )]
+        append = parts.append
+        
+        # Weekly goals
+        if schedule_data.get('weekly_goals'):
+            append(WEEKLY_HTML_GOALS_TMPL.format(goals=schedule_data['weekly_goals']))
+        
+        # Weekly overview
+        append('<div class="week-overview">')
+        
+        for day, day_schedule in days:
+            append(WEEKLY_HTML_DAY_TMPL.format(
+                day=day, date=day_schedule.get('date', ''),
+                focus=day_schedule.get('focus_theme', ''), hours=day_schedule.get('total_hours', 0)
+            ))
             
-            if 'ai_analysis' in schedule_data:
-                f.write(f"""
-    <div class="weekly-summary">
-        <h3>🤖 AI Weekly Analysis</h3>
-        <p>{schedule_data['ai_analysis']}</p>
-    </div>
-""")
+            for task in day_schedule.get('tasks', []):
+                append(WEEKLY_HTML_TASK_TMPL.format(
+                    priority_class=priority_class_for(task['priority']),
+                    icon=priority_icon_for(task['priority']), title=task['title'],
+                    est_time=task['est_time'], category=task['category'],
+                    energy_icon=ENERGY_ICONS.get(task['energy_level'], LOW_ENERGY_ICON)
+                ))
             
-            f.write("""
-</body>
-</html>
-""")
+            append('        </div>')
+        
+        append('</div>')
+        
+        # Weekly summary
+        append(WEEKLY_HTML_SUMMARY_TMPL.format(
+            total_hours=total_hours_str, daily_average=f"{total_hours / 5:.1f}",
+            priority_focus=schedule_data.get('priority_focus', 'N/A').title()
+        ))
+        
+        if 'ai_analysis' in schedule_data:
+            append(WEEKLY_HTML_AI_TMPL.format(analysis=schedule_data['ai_analysis']))
+        
+        append(HTML_FOOTER)
+        
+        with open(filename, 'w', encoding='utf-8', buffering=EXPORT_BUFFER_SIZE) as f:
+            f.write(''.join(parts))
         
         print(f"✅ Weekly HTML exported: {filename}")
     
-    def _export_weekly_txt(self, name, start_date, schedule_data):
+    def _export_weekly_txt(self, name, start_date, schedule_data, days=None):
         """Export weekly schedule as text file"""
-        filename = f"data/{name}_weekly_{start_date}.txt"
-        
-        with open(filename, 'w', encoding='utf-8') as f:
-            f.write(f"🗓️ {name}\n")
-            f.write(f"Week of {start_date}\n")
-            f.write(f"Work Hours: {schedule_data.get('work_hours', 'N/A')}\n")
-            f.write(f"Total Hours: {schedule_data.get('total_hours', 0):.1f}\n")
-            f.write("=" * 60 + "\n\n")
-            
-            if schedule_data.get('weekly_goals'):
-                f.write(f"🎯 WEEKLY GOALS:\n{schedule_data['weekly_goals']}\n\n")
-            
-            weekly_schedule = schedule_data.get('schedule', {})
-            weekdays = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday']
-            
-            for day in weekdays:
-                if day in weekly_schedule:
-                    day_schedule = weekly_schedule[day]
-                    f.write(f"📅 {day.upper()} ({day_schedule.get('date', '')}) - {day_schedule.get('focus_theme', '')}\n")
-                    f.write(f"⏱️ Total: {day_schedule.get('total_hours', 0):.1f} hours\n")
-                    f.write("-" * 40 + "\n")
-                    
-                    for i, task in enumerate(day_schedule.get('tasks', []), 1):
-                        priority_icon = "🔥" if task['priority'] >= 16 else "🟡" if task['priority'] >= 12 else "🟢"
-                        energy_icon = "⚡" if task['energy_level'] == 'high' else "🔋" if task['energy_level'] == 'medium' else "💤"
-                        
-                        f.write(f"{i}. {priority_icon} {task['title']}\n")
-                        f.write(f"   ⏱️ {task['est_time']}h | 📂 {task['category']} | {energy_icon} {task['energy_level']}\n")
-                    
-                    f.write("\n")
+        filename = os.path.join(self._data_dir, f"{name}_weekly_{start_date}.txt")
+        
+        if days is None:
+            days = weekly_days(schedule_data)
+        
+        parts = []
+        append = parts.append
+        append(f"🗓️ {name}\n")
+        append(f"Week of {start_date}\n")
+        append(f"Work Hours: {schedule_data.get('work_hours', 'N/A')}\n")
+        append(f"Total Hours: {schedule_data.get('total_hours', 0):.1f}\n")
+        append("=" * 60 + "\n\n")
+        
+        if schedule_data.get('weekly_goals'):
+            append(f"🎯 WEEKLY GOALS:\n{schedule_data['weekly_goals']}\n\n")
+        
+        for day, day_schedule in days:
+            append(f"📅 {day.upper()} ({day_schedule.get('date', '')}) - {day_schedule.get('focus_theme', '')}\n")
+            append(f"⏱️ Total: {day_schedule.get('total_hours', 0):.1f} hours\n")
+            append("-" * 40 + "\n")
+            
+            for i, task in enumerate(day_schedule.get('tasks', []), 1):
+                priority_icon = priority_icon_for(task['priority'])
+                energy_icon = ENERGY_ICONS.get(task['energy_level'], LOW_ENERGY_ICON)
+                
+                append(f"{i}. {priority_icon} {task['title']}\n")
+                append(f"   ⏱️ {task['est_time']}h | 📂 {task['category']} | {energy_icon} {task['energy_level']}\n")
             
-            if 'ai_analysis' in schedule_data:
-                f.write("🤖 AI WEEKLY ANALYSIS:\n")
-                f.write("=" * 60 + "\n")
-                f.write(schedule_data['ai_analysis'])
+            append("\n")
+        
+        if 'ai_analysis' in schedule_data:
+            append("🤖 AI WEEKLY ANALYSIS:\n")
+            append("=" * 60 + "\n")
+            append(schedule_data['ai_analysis'])
+        
+        with open(filename, 'w', encoding='utf-8', buffering=EXPORT_BUFFER_SIZE) as f:
+            f.write(''.join(parts))
         
         print(f"✅ Weekly text file exported: {filename}")
     
@@ -3234,20 +3436,15 @@ class MasterJarvis:
         """Show system analytics"""
         self.visual.print_header("📊 SYSTEM ANALYTICS")
         
-        conn = sqlite3.connect(self.db.db_path)
-        cursor = conn.cursor()
+        cursor = self.db.conn.cursor()
         
-        # Get basic stats
-        cursor.execute("SELECT COUNT(*) FROM tasks")
-        total_tasks = cursor.fetchone()[0]
-        
-        cursor.execute("SELECT COUNT(*) FROM tasks WHERE status = 'completed'")
-        completed_tasks = cursor.fetchone()[0]
-        
-        cursor.execute("SELECT COUNT(*) FROM conversations")
-        total_conversations = cursor.fetchone()[0]
-        
-        conn.close()
+        # Get basic stats in one round trip
+        cursor.execute('''
+            SELECT (SELECT COUNT(*) FROM tasks),
+                   (SELECT COUNT(*) FROM tasks WHERE status = 'completed'),
+                   (SELECT COUNT(*) FROM conversations)
+        ''')
+        total_tasks, completed_tasks, total_conversations = cursor.fetchone()
         
         completion_rate = (completed_tasks / total_tasks * 100) if total_tasks > 0 else 0
         
@@ -3259,13 +3456,13 @@ class MasterJarvis:
         print(f"   🧠 AI learning active: {'Yes' if CLAUDE_API_KEY else 'Limited (no API key)'}")
         print(f"   🎨 Visual interface: {'Enabled' if VISUAL_AVAILABLE else 'Basic (install colorama)'}")
         
-        input("\n📱 Press Enter to continue...")
+        read_input("\n📱 Press Enter to continue...")
     
     def manage_preferences(self):
         """Manage user preferences"""
         self.visual.print_header("⚙️ PREFERENCES")
         print("🚧 This feature will be implemented in the next update!")
-        input("\n📱 Press Enter to continue...")
+        read_input("\n📱 Press Enter to continue...")
 
 if __name__ == "__main__":
     master_jarvis = MasterJarvis()
@@ -2,13 +2,15 @@
 # File: src/multi_day_scheduler.py
 
 import anthropic
+import asyncio
 import sqlite3
 import json
+import hashlib
 import sys
 import os
 from datetime import datetime, timedelta, date
+from itertools import count, takewhile
 from typing import List, Dict, Any, Optional
-import re
 
 # Add config directory to path
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
@@ -19,6 +21,294 @@ except ImportError:
     print("Error: Could not import CLAUDE_API_KEY from config.credentials")
     sys.exit(1)
 
+# Fixed parts of the AI prompts. They go first in each request and the
+# per-call details follow in a separate block. Both are well under the
+# 1024-token minimum for prompt caching, so no cache_control marker is sent.
+_ANALYZE_TEMPLATE = """
+Analyze the multi-day project described after these instructions for optimal scheduling.
+
+Please provide a detailed breakdown in JSON format:
+{
+    "project_phases": [
+        {
+            "phase_name": "Research and Planning",
+            "description": "Detailed phase description",
+            "estimated_hours": 8.0,
+            "priority": "high",
+            "dependencies": [],
+            "optimal_day_range": [1, 3],
+            "daily_tasks": [
+                {
+                    "task": "Specific daily task",
+                    "duration_minutes": 120,
+                    "energy_required": "high",
+                    "best_time_of_day": "morning"
+                }
+            ]
+        }
+    ],
+    "critical_path": ["phase1", "phase2", "phase3"],
+    "risk_factors": ["potential delays", "resource constraints"],
+    "buffer_recommendations": {
+        "minimum_buffer_days": 2,
+        "recommended_daily_hours": 3.5,
+        "intensity_distribution": "front-loaded"
+    },
+    "success_metrics": ["measurable outcomes", "key milestones"],
+    "flexibility_points": ["areas where schedule can be adjusted"]
+}
+
+Consider realistic work capacity, energy management, and dependency chains.
+"""
+
+_WEEK_TEMPLATE = """
+Create an optimized 7-day schedule for the schedule context given after these instructions.
+
+Optimization Goals:
+1. Respect project deadlines and dependencies
+2. Balance daily workload within capacity limits
+3. Optimize for energy levels throughout each day
+4. Include all recurring tasks at preferred times
+5. Provide buffer time for unexpected issues
+6. Minimize context switching between different types of work
+
+Provide schedule in JSON format:
+{
+    "weekly_schedule": {
+        "2025-01-15": [
+            {
+                "time": "9:00 AM",
+                "task": "Project A - Planning Phase",
+                "duration": "2 hours",
+                "project_id": "proj_a",
+                "energy_match": "high energy for complex planning",
+                "priority": "high",
+                "type": "project_work"
+            },
+            {
+                "time": "11:00 AM",
+                "task": "Daily Email Review",
+                "duration": "30 minutes",
+                "project_id": "recurring",
+                "energy_match": "medium energy for routine task",
+                "priority": "medium",
+                "type": "recurring"
+            }
+        ]
+    },
+    "optimization_notes": {
+        "workload_balance": "Even distribution with lighter Friday",
+        "energy_optimization": "High-focus work scheduled for mornings",
+        "risk_mitigation": "Buffer time included each day",
+        "context_switching": "Related tasks grouped together"
+    },
+    "weekly_metrics": {
+        "total_project_hours": 32.5,
+        "recurring_task_hours": 8.5,
+        "buffer_hours": 7.0,
+        "capacity_utilization": "85%"
+    },
+    "flexibility_recommendations": [
+        "Tuesday afternoon can accommodate urgent requests",
+        "Friday has extra buffer for week wrap-up"
+    ]
+}
+
+Prioritize realistic scheduling and sustainable work patterns.
+"""
+
+# Longest project horizon analyze_multi_day_project accepts
+MAX_PROJECT_DAYS = 365
+
+# Output token caps: a tuned first attempt, then a retry if the reply is cut off
+ANALYZE_MAX_TOKENS = (1500, 2500)
+WEEK_MAX_TOKENS = (2000, 3000)
+
+# In-flight requests allowed by analyze_many
+MAX_CONCURRENT_ANALYSES = 5
+
+# Fixed fields of the fallback week schedule entries
+_MORNING_PROJECT_TEMPLATE = {
+    "time": "9:00 AM",
+    "duration": "2 hours",
+    "energy_match": "high energy morning work",
+    "priority": "high",
+    "type": "project_work"
+}
+_RECURRING_TASK_TEMPLATE = {
+    "project_id": "recurring",
+    "energy_match": "medium energy routine work",
+    "priority": "medium",
+    "type": "recurring"
+}
+
+# Schema for the advanced scheduling tables, applied in one transaction
+_SCHEMA_SQL = '''
+BEGIN;
+
+-- Multi-day projects table
+CREATE TABLE IF NOT EXISTS multi_day_projects (
+    id INTEGER PRIMARY KEY,
+    project_name TEXT,
+    description TEXT,
+    start_date TEXT,
+    end_date TEXT,
+    priority TEXT,
+    total_estimated_hours REAL,
+    completion_status REAL DEFAULT 0,
+    created_date TIMESTAMP
+);
+
+-- Daily capacity and energy profiles
+CREATE TABLE IF NOT EXISTS daily_profiles (
+    id INTEGER PRIMARY KEY,
+    date TEXT,
+    available_hours REAL,
+    energy_morning REAL,
+    energy_afternoon REAL,
+    energy_evening REAL,
+    focus_capacity REAL,
+    notes TEXT
+);
+
+-- Multi-day schedule assignments
+CREATE TABLE IF NOT EXISTS multi_day_assignments (
+    id INTEGER PRIMARY KEY,
+    project_id INTEGER,
+    date TEXT,
+    time_slot TEXT,
+    task_description TEXT,
+    estimated_duration INTEGER,
+    priority TEXT,
+    energy_requirement TEXT,
+    dependencies TEXT,
+    status TEXT DEFAULT 'planned',
+    FOREIGN KEY (project_id) REFERENCES multi_day_projects (id)
+);
+
+-- Recurring task patterns
+CREATE TABLE IF NOT EXISTS recurring_tasks (
+    id INTEGER PRIMARY KEY,
+    task_name TEXT,
+    description TEXT,
+    frequency TEXT,
+    duration INTEGER,
+    preferred_time TEXT,
+    energy_level TEXT,
+    days_of_week TEXT,
+    start_date TEXT,
+    end_date TEXT,
+    is_active BOOLEAN DEFAULT TRUE
+);
+
+-- AI responses keyed by a hash of the request inputs
+CREATE TABLE IF NOT EXISTS llm_cache (
+    key TEXT PRIMARY KEY,
+    response_json TEXT,
+    created TIMESTAMP
+);
+
+-- Serve the period lookup, per-project assignment deletes and the
+-- active recurring task listing without full table scans
+CREATE INDEX IF NOT EXISTS idx_mdp_dates ON multi_day_projects (start_date, end_date, priority);
+CREATE INDEX IF NOT EXISTS idx_mda_proj_date ON multi_day_assignments (project_id, date);
+CREATE INDEX IF NOT EXISTS idx_rt_active ON recurring_tasks (is_active, task_name);
+
+COMMIT;
+'''
+
+# Fixed SQL for the CRUD paths. The connection caches prepared statements by
+# SQL text, so reusing these strings skips re-parsing on every call.
+_SQL_INSERT_RECURRING = '''
+    INSERT INTO recurring_tasks 
+    (task_name, frequency, duration, preferred_time, energy_level, start_date)
+    VALUES (?, ?, ?, ?, ?, ?)
+'''
+_SQL_DELETE_RECURRING = 'DELETE FROM recurring_tasks WHERE id = ?'
+_SQL_UPDATE_COMPLETION = 'UPDATE multi_day_projects SET completion_status = ? WHERE id = ?'
+_SQL_GET_PROJECT = '''
+    SELECT id, project_name, description, start_date, end_date, 
+           priority, total_estimated_hours, completion_status, created_date
+    FROM multi_day_projects
+    WHERE id = ?
+'''
+
+# Columns update_recurring_task may change
+_RECURRING_UPDATE_FIELDS = frozenset((
+    'task_name', 'description', 'frequency', 'duration',
+    'preferred_time', 'energy_level', 'days_of_week', 'is_active'
+))
+
+_JSON_DECODER = json.JSONDecoder()
+
+def _extract_json(text: str) -> Optional[Dict[str, Any]]:
+    """First JSON object in an AI response, or None when there isn't one.
+    
+    raw_decode parses forward from the first '{' in one linear pass and stops
+    at the end of that object, so prose after it is ignored.
+    """
+    start = text.find('{')
+    if start < 0:
+        return None
+    return _JSON_DECODER.raw_decode(text, start)[0]
+
+def _read_streamed_json(text_stream) -> Optional[Dict[str, Any]]:
+    """First JSON object from a streamed AI response, or None when none completes.
+    
+    Brace depth is tracked as text arrives, so reading stops as soon as the
+    object closes instead of waiting for the rest of the completion.
+    """
+    parts = []
+    depth = 0
+    started = in_string = escaped = False
+    for text in text_stream:
+        parts.append(text)
+        for ch in text:
+            if in_string:
+                if escaped:
+                    escaped = False
+                elif ch == '\\':
+                    escaped = True
+                elif ch == '"':
+                    in_string = False
+            elif ch == '{':
+                depth += 1
+                started = True
+            elif not started:
+                continue
+            elif ch == '"':
+                in_string = True
+            elif ch == '}':
+                depth -= 1
+                if depth == 0:
+                    return _extract_json(''.join(parts))
+    return None
+
+def _expand_assignments(project_id: int, analysis: Dict[str, Any], start_date: date, end_date: date):
+    """Yield one multi_day_assignments row per daily task, one day apart within each phase.
+
+    Tasks that would land after end_date are dropped.
+    """
+    end_iso = end_date.isoformat()
+    for phase in analysis.get('project_phases', []):
+        phase_start = start_date + timedelta(days=phase.get('optimal_day_range', [1, 1])[0] - 1)
+        priority = phase.get('priority', 'medium')
+        rows = (
+            (
+                project_id,
+                (phase_start + timedelta(days=n)).isoformat(),
+                daily_task.get('task', 'Project work'),
+                daily_task.get('duration_minutes', 60),
+                priority,
+                daily_task.get('energy_required', 'medium'),
+                daily_task.get('best_time_of_day', 'morning')
+            )
+            for n, daily_task in zip(count(), phase.get('daily_tasks', []))
+        )
+        # ISO dates compare correctly as strings
+        yield from takewhile(lambda row: row[1] <= end_iso, rows)
+
+
 class MultiDayScheduler:
     """
     Advanced Multi-Day Planning System with Full CRUD Operations
@@ -34,78 +324,95 @@ class MultiDayScheduler:
     
     def __init__(self, db_path: str):
         self.client = anthropic.Anthropic(api_key=CLAUDE_API_KEY)
+        self.aclient = anthropic.AsyncAnthropic(api_key=CLAUDE_API_KEY)
         self.db_path = db_path
+        # One connection for the scheduler's lifetime instead of one per call
+        self.conn = sqlite3.connect(db_path, cached_statements=256)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.execute('PRAGMA temp_store=MEMORY')
+        self.conn.execute('PRAGMA cache_size=-20000')  # ~20 MB page cache
+        # Rows convert straight to dicts keyed by column name
+        self.conn.row_factory = sqlite3.Row
         self.setup_advanced_database()
     
+    def close(self):
+        """Close the shared database connection"""
+        self.conn.close()
+    
     def setup_advanced_database(self):
         """Create advanced scheduling tables"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            
-            # Multi-day projects table
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS multi_day_projects (
-                    id INTEGER PRIMARY KEY,
-                    project_name TEXT,
-                    description TEXT,
-                    start_date TEXT,
-                    end_date TEXT,
-                    priority TEXT,
-                    total_estimated_hours REAL,
-                    completion_status REAL DEFAULT 0,
-                    created_date TIMESTAMP
-                )
-            ''')
-            
-            # Daily capacity and energy profiles
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS daily_profiles (
-                    id INTEGER PRIMARY KEY,
-                    date TEXT,
-                    available_hours REAL,
-                    energy_morning REAL,
-                    energy_afternoon REAL,
-                    energy_evening REAL,
-                    focus_capacity REAL,
-                    notes TEXT
-                )
-            ''')
-            
-            # Multi-day schedule assignments
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS multi_day_assignments (
-                    id INTEGER PRIMARY KEY,
-                    project_id INTEGER,
-                    date TEXT,
-                    time_slot TEXT,
-                    task_description TEXT,
-                    estimated_duration INTEGER,
-                    priority TEXT,
-                    energy_requirement TEXT,
-                    dependencies TEXT,
-                    status TEXT DEFAULT 'planned',
-                    FOREIGN KEY (project_id) REFERENCES multi_day_projects (id)
-                )
-            ''')
-            
-            # Recurring task patterns
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS recurring_tasks (
-                    id INTEGER PRIMARY KEY,
-                    task_name TEXT,
-                    description TEXT,
-                    frequency TEXT,
-                    duration INTEGER,
-                    preferred_time TEXT,
-                    energy_level TEXT,
-                    days_of_week TEXT,
-                    start_date TEXT,
-                    end_date TEXT,
-                    is_active BOOLEAN DEFAULT TRUE
-                )
-            ''')
-            
-            conn.commit()
+        self.conn.executescript(_SCHEMA_SQL)
+    
+    def _llm_cache_key(self, kind: str, inputs: List[Any]) -> str:
+        """SHA-256 of a request kind and its inputs, stable across dict ordering"""
+        payload = json.dumps([kind, inputs], sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+    
+    def _get_cached_response(self, key: str) -> Optional[Dict[str, Any]]:
+        """Previously parsed AI response for this key, or None"""
+        row = self.conn.execute('SELECT response_json FROM llm_cache WHERE key = ?', (key,)).fetchone()
+        return json.loads(row[0]) if row else None
+    
+    def _store_cached_response(self, key: str, response: Dict[str, Any]):
+        """Remember a parsed AI response so identical requests skip the API call"""
+        with self.conn:
+            self.conn.execute(
+                'INSERT OR REPLACE INTO llm_cache (key, response_json, created) VALUES (?, ?, ?)',
+                (key, json.dumps(response), datetime.now())
+            )
+    
+    def _build_analyze_prompt(self, project_description: str, deadline_days: int,
+                              estimated_total_hours: float) -> Dict[str, Any]:
+        """Build the request shared by the sync and async analyzers, minus max_tokens"""
+        # Static instructions first; only the short project details below change between calls
+        project_context = (
+            f"Project: {project_description}\n"
+            f"Deadline: {deadline_days} days from now\n"
+            f"Estimated Total Time: {estimated_total_hours} hours"
+        )
+        
+        return {
+            "model": "claude-3-5-sonnet-20241022",
+            "messages": [{"role": "user", "content": [
+                {"type": "text", "text": _ANALYZE_TEMPLATE},
+                {"type": "text", "text": project_context}
+            ]}]
+        }
+    
+    def _stream_json(self, request: Dict[str, Any], max_tokens_caps) -> Optional[Dict[str, Any]]:
+        """Stream a request and return its JSON object, retrying with the next cap when truncated"""
+        for max_tokens in max_tokens_caps:
+            # Leaving the block closes the stream once the JSON object is complete
+            with self.client.messages.stream(**request, max_tokens=max_tokens) as stream:
+                result = _read_streamed_json(stream.text_stream)
+                if result is not None or stream.get_final_message().stop_reason != "max_tokens":
+                    return result
+        return None
+    
+    def _precheck_analysis(self, project_description: str, deadline_days: int,
+                           estimated_total_hours: float):
+        """Validate the inputs; return a breakdown when no AI call is needed, else None"""
+        if deadline_days > MAX_PROJECT_DAYS:
+            raise ValueError(f"deadline_days must be at most {MAX_PROJECT_DAYS}, got {deadline_days}")
+        
+        # Nothing for the AI to decompose: answer directly with the rule-based breakdown
+        if not project_description.strip() or deadline_days <= 1 or estimated_total_hours <= 1.0:
+            return self.create_fallback_project_breakdown(
+                project_description, deadline_days, estimated_total_hours
+            )
+        
+        return None
+    
+    def _finish_analysis(self, cache_key: str, analysis: Optional[Dict[str, Any]], project_description: str,
+                         deadline_days: int, estimated_total_hours: float) -> Dict[str, Any]:
+        if analysis is not None:
+            self._store_cached_response(cache_key, analysis)
+            return analysis
+        else:
+            return self.create_fallback_project_breakdown(
+                project_description, deadline_days, estimated_total_hours
+            )
     
     def analyze_multi_day_project(self, project_description: str, deadline_days: int, 
                                 estimated_total_hours: float) -> Dict[str, Any]:
@@ -114,64 +421,29 @@ class MultiDayScheduler:
         
         Use AI to break down large projects into manageable daily tasks
         while considering realistic time constraints and dependencies.
+        
+        Any failure past input validation falls back to the rule-based breakdown.
+        
+        Raises:
+            ValueError: if deadline_days is greater than MAX_PROJECT_DAYS.
         """
+        answer = self._precheck_analysis(project_description, deadline_days, estimated_total_hours)
+        if answer is not None:
+            return answer
+        
         try:
-            prompt = f"""
-            Analyze this multi-day project for optimal scheduling:
-            
-            Project: {project_description}
-            Deadline: {deadline_days} days from now
-            Estimated Total Time: {estimated_total_hours} hours
-            
-            Please provide a detailed breakdown in JSON format:
-            {{
-                "project_phases": [
-                    {{
-                        "phase_name": "Research and Planning",
-                        "description": "Detailed phase description",
-                        "estimated_hours": 8.0,
-                        "priority": "high",
-                        "dependencies": [],
-                        "optimal_day_range": [1, 3],
-                        "daily_tasks": [
-                            {{
-                                "task": "Specific daily task",
-                                "duration_minutes": 120,
-                                "energy_required": "high",
-                                "best_time_of_day": "morning"
-                            }}
-                        ]
-                    }}
-                ],
-                "critical_path": ["phase1", "phase2", "phase3"],
-                "risk_factors": ["potential delays", "resource constraints"],
-                "buffer_recommendations": {{
-                    "minimum_buffer_days": 2,
-                    "recommended_daily_hours": 3.5,
-                    "intensity_distribution": "front-loaded"
-                }},
-                "success_metrics": ["measurable outcomes", "key milestones"],
-                "flexibility_points": ["areas where schedule can be adjusted"]
-            }}
-            
-            Consider realistic work capacity, energy management, and dependency chains.
-            """
-            
-            response = self.client.messages.create(
-                model="claude-3-5-sonnet-20241022",
-                max_tokens=2500,
-                messages=[{"role": "user", "content": prompt}]
+            cache_key = self._llm_cache_key('analyze_project', [project_description, deadline_days, estimated_total_hours])
+            cached = self._get_cached_response(cache_key)
+            if cached is not None:
+                return cached
+            
+            analysis = self._stream_json(
+                self._build_analyze_prompt(project_description, deadline_days, estimated_total_hours),
+                ANALYZE_MAX_TOKENS
             )
             
-            response_text = response.content[0].text.strip()
-            json_match = re.search(r'\{.*\}', response_text, re.DOTALL)
-            
-            if json_match:
-                return json.loads(json_match.group())
-            else:
-                return self.create_fallback_project_breakdown(
-                    project_description, deadline_days, estimated_total_hours
-                )
+            return self._finish_analysis(cache_key, analysis, project_description,
+                                         deadline_days, estimated_total_hours)
                 
         except Exception as e:
             print(f"Error in project analysis: {str(e)}")
@@ -179,6 +451,60 @@ class MultiDayScheduler:
                 project_description, deadline_days, estimated_total_hours
             )
     
+    async def analyze_multi_day_project_async(self, project_description: str, deadline_days: int,
+                                              estimated_total_hours: float) -> Dict[str, Any]:
+        """Async twin of analyze_multi_day_project for batch intake; raises ValueError the same way"""
+        answer = self._precheck_analysis(project_description, deadline_days, estimated_total_hours)
+        if answer is not None:
+            return answer
+        
+        try:
+            cache_key = self._llm_cache_key('analyze_project', [project_description, deadline_days, estimated_total_hours])
+            cached = self._get_cached_response(cache_key)
+            if cached is not None:
+                return cached
+            
+            request = self._build_analyze_prompt(project_description, deadline_days, estimated_total_hours)
+            for max_tokens in ANALYZE_MAX_TOKENS:
+                response = await self.aclient.messages.create(**request, max_tokens=max_tokens)
+                if response.stop_reason != "max_tokens":
+                    break
+            
+            return self._finish_analysis(cache_key, _extract_json(response.content[0].text), project_description,
+                                         deadline_days, estimated_total_hours)
+                
+        except Exception as e:
+            print(f"Error in project analysis: {str(e)}")
+            return self.create_fallback_project_breakdown(
+                project_description, deadline_days, estimated_total_hours
+            )
+    
+    async def analyze_many(self, projects: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Analyze several projects concurrently.
+        
+        Each project is a dict with description, deadline_days and
+        estimated_total_hours. Results come back in input order. Every project
+        is validated before any request goes out, so a bad entry raises
+        ValueError without spending API calls on the rest.
+        """
+        for i, project in enumerate(projects):
+            if project['deadline_days'] > MAX_PROJECT_DAYS:
+                raise ValueError(
+                    f"project {i}: deadline_days must be at most {MAX_PROJECT_DAYS}, "
+                    f"got {project['deadline_days']}"
+                )
+        
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_ANALYSES)
+        
+        async def analyze_one(project: Dict[str, Any]) -> Dict[str, Any]:
+            async with semaphore:
+                return await self.analyze_multi_day_project_async(
+                    project['description'], project['deadline_days'], project['estimated_total_hours']
+                )
+        
+        return await asyncio.gather(*(analyze_one(project) for project in projects))
+    
     def create_fallback_project_breakdown(self, project: str, days: int, hours: float) -> Dict[str, Any]:
         """Fallback project breakdown if AI analysis fails"""
         daily_hours = hours / max(days - 1, 1)  # Leave 1 day buffer
@@ -253,85 +579,38 @@ class MultiDayScheduler:
         Create optimal week schedule balancing multiple projects, recurring tasks,
         energy levels, and capacity constraints.
         """
+        # Nothing to schedule: skip the AI call
+        if not projects and not recurring_tasks:
+            return self.create_fallback_week_schedule(start_date, projects, recurring_tasks)
+        
         try:
-            # Prepare data for AI analysis
+            cache_key = self._llm_cache_key(
+                'week_schedule', [start_date.isoformat(), projects, recurring_tasks, daily_capacity]
+            )
+            cached = self._get_cached_response(cache_key)
+            if cached is not None:
+                return cached
+            
+            # Prepare data for AI analysis; dates are serialized by default=str
             schedule_context = {
-                "start_date": start_date.isoformat(),
+                "start_date": start_date,
                 "projects": projects,
                 "recurring_tasks": recurring_tasks,
                 "daily_capacity": daily_capacity,
-                "week_days": [(start_date + timedelta(days=i)).isoformat() for i in range(7)]
+                "week_days": [start_date + timedelta(days=i) for i in range(7)]
             }
             
-            prompt = f"""
-            Create an optimized 7-day schedule with the following constraints:
-            
-            Schedule Context: {json.dumps(schedule_context, indent=2)}
-            
-            Optimization Goals:
-            1. Respect project deadlines and dependencies
-            2. Balance daily workload within capacity limits
-            3. Optimize for energy levels throughout each day
-            4. Include all recurring tasks at preferred times
-            5. Provide buffer time for unexpected issues
-            6. Minimize context switching between different types of work
-            
-            Provide schedule in JSON format:
-            {{
-                "weekly_schedule": {{
-                    "2025-01-15": [
-                        {{
-                            "time": "9:00 AM",
-                            "task": "Project A - Planning Phase",
-                            "duration": "2 hours",
-                            "project_id": "proj_a",
-                            "energy_match": "high energy for complex planning",
-                            "priority": "high",
-                            "type": "project_work"
-                        }},
-                        {{
-                            "time": "11:00 AM",
-                            "task": "Daily Email Review",
-                            "duration": "30 minutes", 
-                            "project_id": "recurring",
-                            "energy_match": "medium energy for routine task",
-                            "priority": "medium",
-                            "type": "recurring"
-                        }}
-                    ]
-                }},
-                "optimization_notes": {{
-                    "workload_balance": "Even distribution with lighter Friday",
-                    "energy_optimization": "High-focus work scheduled for mornings",
-                    "risk_mitigation": "Buffer time included each day",
-                    "context_switching": "Related tasks grouped together"
-                }},
-                "weekly_metrics": {{
-                    "total_project_hours": 32.5,
-                    "recurring_task_hours": 8.5,
-                    "buffer_hours": 7.0,
-                    "capacity_utilization": "85%"
-                }},
-                "flexibility_recommendations": [
-                    "Tuesday afternoon can accommodate urgent requests",
-                    "Friday has extra buffer for week wrap-up"
-                ]
-            }}
-            
-            Prioritize realistic scheduling and sustainable work patterns.
-            """
-            
-            response = self.client.messages.create(
-                model="claude-3-5-sonnet-20241022",
-                max_tokens=3000,
-                messages=[{"role": "user", "content": prompt}]
-            )
-            
-            response_text = response.content[0].text.strip()
-            json_match = re.search(r'\{.*\}', response_text, re.DOTALL)
-            
-            if json_match:
-                return json.loads(json_match.group())
+            schedule = self._stream_json({
+                "model": "claude-3-5-sonnet-20241022",
+                "messages": [{"role": "user", "content": [
+                    {"type": "text", "text": _WEEK_TEMPLATE},
+                    {"type": "text", "text": f"Schedule Context: {json.dumps(schedule_context, separators=(',', ':'), default=str)}"}
+                ]}]
+            }, WEEK_MAX_TOKENS)
+            
+            if schedule is not None:
+                self._store_cached_response(cache_key, schedule)
+                return schedule
             else:
                 return self.create_fallback_week_schedule(start_date, projects, recurring_tasks)
                 
@@ -344,34 +623,32 @@ class MultiDayScheduler:
         """Fallback week schedule if AI generation fails"""
         schedule = {"weekly_schedule": {}}
         
+        # Everything that doesn't change from day to day is built once up front
+        morning_task = None
+        if projects:
+            morning_task = {
+                **_MORNING_PROJECT_TEMPLATE,
+                "task": f"{projects[0].get('project_name', 'Project Work')} - Daily Progress",
+                "project_id": projects[0].get('id', 'project_1')
+            }
+        
+        # Recurring tasks are distributed round-robin, one per day
+        recurring_entries = [{
+            **_RECURRING_TASK_TEMPLATE,
+            "time": task.get('preferred_time', '2:00 PM'),
+            "task": task.get('task_name', 'Recurring Task'),
+            "duration": f"{task.get('duration', 30)} minutes"
+        } for task in recurring_tasks]
+        
         for i in range(7):
             current_date = (start_date + timedelta(days=i)).isoformat()
             daily_tasks = []
             
-            # Add morning project work
-            if projects:
-                daily_tasks.append({
-                    "time": "9:00 AM",
-                    "task": f"{projects[0].get('project_name', 'Project Work')} - Daily Progress",
-                    "duration": "2 hours",
-                    "project_id": projects[0].get('id', 'project_1'),
-                    "energy_match": "high energy morning work",
-                    "priority": "high",
-                    "type": "project_work"
-                })
+            if morning_task:
+                daily_tasks.append(dict(morning_task))
             
-            # Add recurring tasks
-            for task in recurring_tasks:
-                if i < len(recurring_tasks):  # Distribute across week
-                    daily_tasks.append({
-                        "time": task.get('preferred_time', '2:00 PM'),
-                        "task": task.get('task_name', 'Recurring Task'),
-                        "duration": f"{task.get('duration', 30)} minutes",
-                        "project_id": "recurring",
-                        "energy_match": "medium energy routine work",
-                        "priority": "medium",
-                        "type": "recurring"
-                    })
+            if recurring_entries:
+                daily_tasks.append(dict(recurring_entries[i % len(recurring_entries)]))
             
             schedule["weekly_schedule"][current_date] = daily_tasks
         
@@ -399,22 +676,18 @@ class MultiDayScheduler:
     def create_recurring_task_pattern(self, task_name: str, frequency: str, 
                                     duration: int, preferred_time: str) -> int:
         """Create a new recurring task pattern"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.conn as conn:
             cursor = conn.cursor()
-            cursor.execute('''
-                INSERT INTO recurring_tasks 
-                (task_name, frequency, duration, preferred_time, energy_level, start_date)
-                VALUES (?, ?, ?, ?, ?, ?)
-            ''', (task_name, frequency, duration, preferred_time, 'medium', 
+            cursor.execute(_SQL_INSERT_RECURRING, (task_name, frequency, duration, preferred_time, 'medium', 
                   datetime.now().isoformat()))
             conn.commit()
             return cursor.lastrowid
     
     def delete_recurring_task(self, task_id: int) -> bool:
         """Delete a recurring task by ID"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.conn as conn:
             cursor = conn.cursor()
-            cursor.execute('DELETE FROM recurring_tasks WHERE id = ?', (task_id,))
+            cursor.execute(_SQL_DELETE_RECURRING, (task_id,))
             conn.commit()
             return cursor.rowcount > 0
     
@@ -423,22 +696,18 @@ class MultiDayScheduler:
         if not updates:
             return False
             
-        set_clauses = []
-        values = []
-        
-        for key, value in updates.items():
-            if key in ['task_name', 'description', 'frequency', 'duration', 
-                      'preferred_time', 'energy_level', 'days_of_week', 'is_active']:
-                set_clauses.append(f"{key} = ?")
-                values.append(value)
+        # Sorted so the same set of fields always yields the same SQL text,
+        # which lets the connection's statement cache reuse the prepared UPDATE
+        fields = sorted(_RECURRING_UPDATE_FIELDS.intersection(updates))
         
-        if not set_clauses:
+        if not fields:
             return False
             
+        values = [updates[key] for key in fields]
         values.append(task_id)
-        query = f"UPDATE recurring_tasks SET {', '.join(set_clauses)} WHERE id = ?"
+        query = f"UPDATE recurring_tasks SET {', '.join(f'{key} = ?' for key in fields)} WHERE id = ?"
         
-        with sqlite3.connect(self.db_path) as conn:
+        with self.conn as conn:
             cursor = conn.cursor()
             cursor.execute(query, values)
             conn.commit()
@@ -447,7 +716,7 @@ class MultiDayScheduler:
     def save_multi_day_project(self, project_data: Dict[str, Any], 
                               analysis: Dict[str, Any]) -> int:
         """Save multi-day project and its breakdown"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.conn as conn:
             cursor = conn.cursor()
             
             # Save main project
@@ -469,38 +738,24 @@ class MultiDayScheduler:
             project_id = cursor.lastrowid
             
             # Save daily task assignments
-            current_date = datetime.fromisoformat(project_data['start_date']).date()
+            start_date = datetime.fromisoformat(project_data['start_date']).date()
             end_date = datetime.fromisoformat(project_data['end_date']).date()
+            assignments = list(_expand_assignments(project_id, analysis, start_date, end_date))
             
-            for phase in analysis.get('project_phases', []):
-                phase_start_day = phase.get('optimal_day_range', [1, 1])[0] - 1
-                assignment_date = current_date + timedelta(days=phase_start_day)
-                
-                for daily_task in phase.get('daily_tasks', []):
-                    if assignment_date <= end_date:
-                        cursor.execute('''
-                            INSERT INTO multi_day_assignments
-                            (project_id, date, task_description, estimated_duration, 
-                             priority, energy_requirement, time_slot)
-                            VALUES (?, ?, ?, ?, ?, ?, ?)
-                        ''', (
-                            project_id,
-                            assignment_date.isoformat(),
-                            daily_task.get('task', 'Project work'),
-                            daily_task.get('duration_minutes', 60),
-                            phase.get('priority', 'medium'),
-                            daily_task.get('energy_required', 'medium'),
-                            daily_task.get('best_time_of_day', 'morning')
-                        ))
-                        
-                        assignment_date += timedelta(days=1)
+            # One statement for every assignment, committed with the project row
+            cursor.executemany('''
+                INSERT INTO multi_day_assignments
+                (project_id, date, task_description, estimated_duration, 
+                 priority, energy_requirement, time_slot)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', assignments)
             
             conn.commit()
             return project_id
     
     def delete_multi_day_project(self, project_id: int) -> bool:
         """Delete a multi-day project and all its assignments"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.conn as conn:
             cursor = conn.cursor()
             
             # Delete project assignments first (foreign key constraint)
@@ -516,72 +771,39 @@ class MultiDayScheduler:
         """Update project completion status"""
         completion_percentage = max(0.0, min(1.0, completion_percentage))  # Clamp between 0 and 1
         
-        with sqlite3.connect(self.db_path) as conn:
+        with self.conn as conn:
             cursor = conn.cursor()
-            cursor.execute('''
-                UPDATE multi_day_projects 
-                SET completion_status = ? 
-                WHERE id = ?
-            ''', (completion_percentage, project_id))
+            cursor.execute(_SQL_UPDATE_COMPLETION, (completion_percentage, project_id))
             conn.commit()
             return cursor.rowcount > 0
     
     def get_projects_in_period(self, start_date: date, end_date: date) -> List[Dict]:
         """Get all projects active in the specified period"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.conn as conn:
             cursor = conn.cursor()
             cursor.execute('''
                 SELECT id, project_name, description, start_date, end_date, 
                        priority, total_estimated_hours, completion_status
                 FROM multi_day_projects
                 WHERE start_date <= ? AND end_date >= ?
-                ORDER BY priority DESC, start_date ASC
+                ORDER BY CASE priority WHEN 'high' THEN 0 WHEN 'medium' THEN 1 WHEN 'low' THEN 2 ELSE 3 END,
+                         start_date ASC
             ''', (end_date.isoformat(), start_date.isoformat()))
             
-            projects = []
-            for row in cursor.fetchall():
-                projects.append({
-                    'id': row[0],
-                    'project_name': row[1],
-                    'description': row[2],
-                    'start_date': row[3],
-                    'end_date': row[4],
-                    'priority': row[5],
-                    'total_estimated_hours': row[6],
-                    'completion_status': row[7]
-                })
-            
-            return projects
+            return [dict(row) for row in cursor.fetchall()]
     
     def get_project_by_id(self, project_id: int) -> Optional[Dict]:
         """Get a specific project by ID"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.conn as conn:
             cursor = conn.cursor()
-            cursor.execute('''
-                SELECT id, project_name, description, start_date, end_date, 
-                       priority, total_estimated_hours, completion_status, created_date
-                FROM multi_day_projects
-                WHERE id = ?
-            ''', (project_id,))
+            cursor.execute(_SQL_GET_PROJECT, (project_id,))
             
             row = cursor.fetchone()
-            if row:
-                return {
-                    'id': row[0],
-                    'project_name': row[1],
-                    'description': row[2],
-                    'start_date': row[3],
-                    'end_date': row[4],
-                    'priority': row[5],
-                    'total_estimated_hours': row[6],
-                    'completion_status': row[7],
-                    'created_date': row[8]
-                }
-            return None
+            return dict(row) if row else None
     
     def get_recurring_tasks(self) -> List[Dict]:
         """Get all active recurring tasks"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.conn as conn:
             cursor = conn.cursor()
             cursor.execute('''
                 SELECT id, task_name, description, frequency, duration, 
@@ -591,24 +813,11 @@ class MultiDayScheduler:
                 ORDER BY task_name ASC
             ''')
             
-            tasks = []
-            for row in cursor.fetchall():
-                tasks.append({
-                    'id': row[0],
-                    'task_name': row[1],
-                    'description': row[2],
-                    'frequency': row[3],
-                    'duration': row[4],
-                    'preferred_time': row[5],
-                    'energy_level': row[6],
-                    'days_of_week': row[7]
-                })
-            
-            return tasks
+            return [dict(row) for row in cursor.fetchall()]
     
     def get_recurring_task_by_id(self, task_id: int) -> Optional[Dict]:
         """Get a specific recurring task by ID"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.conn as conn:
             cursor = conn.cursor()
             cursor.execute('''
                 SELECT id, task_name, description, frequency, duration, 
@@ -619,26 +828,12 @@ class MultiDayScheduler:
             ''', (task_id,))
             
             row = cursor.fetchone()
-            if row:
-                return {
-                    'id': row[0],
-                    'task_name': row[1],
-                    'description': row[2],
-                    'frequency': row[3],
-                    'duration': row[4],
-                    'preferred_time': row[5],
-                    'energy_level': row[6],
-                    'days_of_week': row[7],
-                    'start_date': row[8],
-                    'end_date': row[9],
-                    'is_active': row[10]
-                }
-            return None
+            return dict(row) if row else None
     
     def save_weekly_schedule(self, schedule_data: Dict[str, Any], 
                            start_date: date) -> int:
         """Save complete weekly schedule"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.conn as conn:
             cursor = conn.cursor()
             
             # Save to saved_schedules table for compatibility
@@ -650,7 +845,7 @@ class MultiDayScheduler:
                 schedule_name,
                 json.dumps(schedule_data),
                 datetime.now(),
-                sum(len(daily_tasks) for daily_tasks in schedule_data['weekly_schedule'].values())
+                sum(map(len, schedule_data['weekly_schedule'].values()))
             ))
             
             return cursor.lastrowid
\ No newline at end of file
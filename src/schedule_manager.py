@@ -1,23 +1,91 @@
 # src/schedule_manager.py
 import sqlite3
+import copy
+import itertools
 import json
 import os
+import threading
+from contextlib import contextmanager
 from datetime import datetime
 from calendar_export import CalendarExporter
 
+# The summary columns are read out of the JSON by SQLite's JSON1 functions
+# while inserting, so saving never walks the schedule in Python
+_SQL_INSERT_SCHEDULE = '''
+    INSERT INTO schedules (name, schedule_data, tasks_count, total_time)
+    VALUES (?1, ?2,
+            COALESCE(json_array_length(?2, '$.schedule'), 0),
+            COALESCE(json_extract(?2, '$.total_time'), 'Unknown'))
+'''
+
+_SQL_LIST_SCHEDULES = '''
+    SELECT id, name, created_at, tasks_count, total_time
+    FROM schedules
+    ORDER BY created_at DESC
+    LIMIT ? OFFSET ?
+'''
+_SQL_ITER_SCHEDULES = '''
+    SELECT id, name, created_at, tasks_count, total_time
+    FROM schedules
+    ORDER BY created_at DESC
+'''
+_SQL_GET_SCHEDULE = '''
+    SELECT id, name, schedule_data, created_at, tasks_count, total_time
+    FROM schedules
+    WHERE id = ?
+'''
+_SQL_DELETE_SCHEDULE = 'DELETE FROM schedules WHERE id = ?'
+
+# Decoded schedules kept in memory by get_schedule
+SCHEDULE_CACHE_SIZE = 64
+
 class ScheduleManager:
     """Manage storage and retrieval of generated schedules"""
     
     def __init__(self, db_path="data/jarvis.db"):
         self.db_path = db_path
+        # One connection for the manager's lifetime keeps SQLite's page cache
+        # warm across calls; autocommit mode so writes manage their own transactions
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None,
+                                     cached_statements=256)
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute('PRAGMA temp_store=MEMORY')
+        self._conn.execute('PRAGMA cache_size=-64000')  # ~64 MB page cache
+        self._conn.execute('PRAGMA mmap_size=268435456')
+        self._write_lock = threading.Lock()
+        # schedule id -> get_schedule result; ids are never reused (AUTOINCREMENT),
+        # so only deletes through this manager need to invalidate
+        self._schedule_cache = {}
         self.init_schedule_table()
+    
+    def close(self):
+        """Close the database connection"""
+        self._conn.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+    
+    @contextmanager
+    def _write_transaction(self):
+        """Serialize writers and run the block in one transaction"""
+        with self._write_lock:
+            self._conn.execute('BEGIN')
+            try:
+                yield
+            except Exception:
+                self._conn.execute('ROLLBACK')
+                raise
+            self._conn.execute('COMMIT')
         
     def init_schedule_table(self):
         """Create schedules table if it doesn't exist"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        # WAL is stored in the database file, so setting it once is enough
+        self._conn.execute('PRAGMA journal_mode=WAL')
         
-        cursor.execute('''
+        self._conn.execute('''
             CREATE TABLE IF NOT EXISTS schedules (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 name TEXT NOT NULL,
@@ -28,63 +96,90 @@ class ScheduleManager:
             )
         ''')
         
-        conn.commit()
-        conn.close()
+        # Covers list_schedules so it reads presorted index entries and
+        # never touches the schedule_data blobs
+        self._conn.execute('''
+            CREATE INDEX IF NOT EXISTS idx_schedules_created
+            ON schedules (created_at DESC, id, name, tasks_count, total_time)
+        ''')
     
-    def save_schedule(self, schedule_data, name=None):
-        """Save a generated schedule to the database"""
-        
+    @staticmethod
+    def _schedule_row(schedule_data, name=None):
+        """INSERT parameters for one schedule"""
         if name is None:
             name = f"Schedule {datetime.now().strftime('%Y-%m-%d %H:%M')}"
         
-        # Extract summary info
-        tasks_count = len(schedule_data.get('schedule', []))
-        total_time = schedule_data.get('total_time', 'Unknown')
-        
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        return (name, json.dumps(schedule_data))
+    
+    def save_schedule(self, schedule_data, name=None):
+        """Save a generated schedule to the database"""
+        row = self._schedule_row(schedule_data, name)
         
-        cursor.execute('''
-            INSERT INTO schedules (name, schedule_data, tasks_count, total_time)
-            VALUES (?, ?, ?, ?)
-        ''', (name, json.dumps(schedule_data), tasks_count, total_time))
+        with self._write_transaction():
+            cursor = self._conn.execute(_SQL_INSERT_SCHEDULE, row)
         
         schedule_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
         
-        print(f"✅ Schedule saved as: {name} (ID: {schedule_id})")
+        print(f"✅ Schedule saved as: {row[0]} (ID: {schedule_id})")
         return schedule_id
     
-    def list_schedules(self):
-        """List all saved schedules"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+    def save_schedules(self, schedules, names=None):
+        """Save many schedules in one transaction; returns how many were saved
         
-        cursor.execute('''
-            SELECT id, name, created_at, tasks_count, total_time
-            FROM schedules
-            ORDER BY created_at DESC
-        ''')
+        schedules may be any iterable. names, if given, must pair one-to-one
+        with schedules or ValueError is raised and nothing is saved.
+        """
+        if names is None:
+            pairs = zip(schedules, itertools.repeat(None))
+        else:
+            pairs = zip(schedules, names, strict=True)
+        rows = (self._schedule_row(schedule_data, name) for schedule_data, name in pairs)
+        
+        with self._write_transaction():
+            cursor = self._conn.executemany(_SQL_INSERT_SCHEDULE, rows)
+        
+        return cursor.rowcount
+    
+    def list_schedules(self, limit=None, offset=0):
+        """List saved schedules, newest first; limit/offset page through them"""
+        # Reads skip the write lock: WAL lets them run alongside a save
+        cursor = self._conn.execute(_SQL_LIST_SCHEDULES, (-1 if limit is None else limit, offset))
         
-        schedules = cursor.fetchall()
-        conn.close()
+        return cursor.fetchall()
+    
+    def iter_schedules(self):
+        """Yield every saved schedule, newest first, a page of rows at a time"""
+        cursor = self._conn.execute(_SQL_ITER_SCHEDULES)
         
-        return schedules
+        while rows := cursor.fetchmany(100):
+            yield from rows
     
     def get_schedule(self, schedule_id):
-        """Retrieve a specific schedule by ID"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        """Retrieve a specific schedule by ID
+        
+        Results are cached per manager and returned as copies, so callers can
+        modify them freely. The cache only sees deletes made through this
+        manager; writes through other connections are not picked up.
+        """
+        cache = self._schedule_cache
+        cached = cache.pop(schedule_id, None)
+        if cached is not None:
+            cache[schedule_id] = cached  # re-insert as most recently used
+            return copy.deepcopy(cached)
         
-        cursor.execute('''
-            SELECT id, name, schedule_data, created_at, tasks_count, total_time
-            FROM schedules
-            WHERE id = ?
-        ''', (schedule_id,))
+        schedule = self._load_schedule(schedule_id)
+        if schedule is not None:
+            cache[schedule_id] = schedule
+            if len(cache) > SCHEDULE_CACHE_SIZE:
+                del cache[next(iter(cache))]  # evict least recently used
+            return copy.deepcopy(schedule)
+        return None
+    
+    def _load_schedule(self, schedule_id):
+        """Read and decode one schedule row"""
+        cursor = self._conn.execute(_SQL_GET_SCHEDULE, (schedule_id,))
         
         result = cursor.fetchone()
-        conn.close()
         
         if result:
             schedule_id, name, schedule_data, created_at, tasks_count, total_time = result
@@ -100,16 +195,11 @@ class ScheduleManager:
     
     def delete_schedule(self, schedule_id):
         """Delete a schedule"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        with self._write_transaction():
+            cursor = self._conn.execute(_SQL_DELETE_SCHEDULE, (schedule_id,))
+        self._schedule_cache.pop(schedule_id, None)
         
-        cursor.execute('DELETE FROM schedules WHERE id = ?', (schedule_id,))
-        deleted = cursor.rowcount > 0
-        
-        conn.commit()
-        conn.close()
-        
-        return deleted
+        return cursor.rowcount > 0
     
     def export_schedule(self, schedule_id, export_type='ics'):
         """Export a saved schedule"""
@@ -147,14 +237,15 @@ def schedule_management_menu():
         choice = input("\nEnter your choice (1-4): ").strip()
         
         if choice == "1":
-            schedules = manager.list_schedules()
-            if schedules:
+            schedules = manager.iter_schedules()
+            first = next(schedules, None)
+            if first:
                 print("\n📋 SAVED SCHEDULES:")
                 print("-" * 80)
                 print(f"{'ID':<4} {'Name':<25} {'Created':<20} {'Tasks':<6} {'Time':<10}")
                 print("-" * 80)
                 
-                for schedule in schedules:
+                for schedule in itertools.chain((first,), schedules):
                     schedule_id, name, created_at, tasks_count, total_time = schedule
                     created_short = created_at[:16] if created_at else "Unknown"
                     print(f"{schedule_id:<4} {name[:24]:<25} {created_short:<20} {tasks_count:<6} {total_time:<10}")
@@ -162,14 +253,14 @@ def schedule_management_menu():
                 print("📭 No saved schedules found")
         
         elif choice == "2":
-            schedules = manager.list_schedules()
+            schedules = manager.list_schedules(limit=10)
             if not schedules:
                 print("📭 No saved schedules to export")
                 continue
             
             # Show available schedules
             print("\n📋 AVAILABLE SCHEDULES:")
-            for schedule in schedules[:10]:  # Show last 10
+            for schedule in schedules:  # Show last 10
                 schedule_id, name, created_at, tasks_count, total_time = schedule
                 print(f"{schedule_id}: {name} ({tasks_count} tasks, {total_time})")
             
@@ -208,14 +299,14 @@ def schedule_management_menu():
                 print("❌ Invalid schedule ID")
         
         elif choice == "3":
-            schedules = manager.list_schedules()
+            schedules = manager.list_schedules(limit=10)
             if not schedules:
                 print("📭 No saved schedules to delete")
                 continue
             
             # Show available schedules
             print("\n📋 AVAILABLE SCHEDULES:")
-            for schedule in schedules[:10]:
+            for schedule in schedules:
                 schedule_id, name, created_at, tasks_count, total_time = schedule
                 print(f"{schedule_id}: {name}")
             
@@ -239,6 +330,8 @@ def schedule_management_menu():
         
         else:
             print("❌ Invalid choice. Please try again.")
+    
+    manager.close()
 
 if __name__ == "__main__":
     schedule_management_menu()
\ No newline at end of file